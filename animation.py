@@ -1,5 +1,11 @@
 from manim import *
 import numpy as np
+import os
+
+from audio import analyze_voice
+from draft import DraftScene, draft_params, scaled
+from dsp import fourier_series, load_or_compute
+from plotting import Epicycles, StemPlot, mobject_outline, plot_function, plot_sampled_signal
 
 # Part 1: Introduction
 class IntroductionScene(Scene):
@@ -28,7 +34,7 @@ class IntroductionScene(Scene):
         self.wait(2)
 
 # Part 2: Basic Sine Wave Explanation
-class SineWaveScene(Scene):
+class SineWaveScene(DraftScene, Scene):
     def construct(self):
         # Create axes
         axes = Axes(
@@ -38,7 +44,7 @@ class SineWaveScene(Scene):
         )
 
         # Create sine wave
-        sine_wave = axes.plot(lambda x: np.sin(x), color=YELLOW)
+        sine_wave = plot_function(axes, np.sin, color=YELLOW)
         
         # Labels
         labels = axes.get_axis_labels(x_label="Time", y_label="Amplitude")
@@ -57,21 +63,24 @@ class SineWaveScene(Scene):
         self.wait(2)
 
 # Part 3: Complex Signal Composition
-class ComplexSignalScene(Scene):
+class ComplexSignalScene(DraftScene, Scene):
     def construct(self):
         axes = Axes(
             x_range=[-4, 4],
             y_range=[-3, 3],
         )
 
-        # Create multiple sine waves with different frequencies
-        wave1 = axes.plot(lambda x: np.sin(x), color=RED)
-        wave2 = axes.plot(lambda x: 0.5 * np.sin(2*x), color=BLUE)
-        wave3 = axes.plot(lambda x: 0.25 * np.sin(4*x), color=GREEN)
+        # Create multiple sine waves with different frequencies, as (frequency, amplitude)
+        # components so their samples are cached: sin(k*x) has frequency k/2pi
+        f = 1 / TAU
+        wave1 = plot_function(axes, components=[(f, 1)], color=RED)
+        wave2 = plot_function(axes, components=[(2*f, 0.5)], color=BLUE)
+        wave3 = plot_function(axes, components=[(4*f, 0.25)], color=GREEN)
         
         # Combined wave
-        combined = axes.plot(
-            lambda x: np.sin(x) + 0.5 * np.sin(2*x) + 0.25 * np.sin(4*x),
+        combined = plot_function(
+            axes,
+            components=[(f, 1), (2*f, 0.5), (4*f, 0.25)],
             color=YELLOW
         )
 
@@ -93,20 +102,20 @@ class ComplexSignalScene(Scene):
 # Continuing from previous code...
 
 # Part 4: Fourier Transform Visualization
-class FourierTransformScene(Scene):
+class FourierTransformScene(DraftScene, Scene):
     def construct(self):
-        # Helper functions for signal processing
-        def get_signal_points(t):
-            """Generate a complex signal composed of three sine waves"""
-            return (np.sin(2 * np.pi * 2 * t) +      # Base frequency: 2 Hz
-                   0.5 * np.sin(2 * np.pi * 5 * t) + # Higher frequency: 5 Hz
-                   0.3 * np.sin(2 * np.pi * 8 * t))  # Highest frequency: 8 Hz
-
         # Setup sampling parameters
         duration = 2  # 2 seconds
         sample_rate = 1000  # 1000 Hz
-        t = np.linspace(0, duration, int(duration * sample_rate))
-        signal = get_signal_points(t)
+        zoom_bins = None  # Set e.g. to 400 to evaluate only 0-10 Hz at that many bins
+
+        # 2, 5 and 8 Hz composite signal and its spectrum (precomputed when available),
+        # sampled more sparsely in draft mode
+        data = load_or_compute("FourierTransformScene", **draft_params(
+            "FourierTransformScene",
+            {"duration": duration, "sample_rate": sample_rate, "zoom_bins": zoom_bins}
+        ))
+        t, signal = data["t"], data["signal"]
 
         # Create axes
         time_axes = Axes(
@@ -137,32 +146,19 @@ class FourierTransformScene(Scene):
         )
 
         # Plot time domain signal
-        time_plot = time_axes.plot_line_graph(
+        time_plot = plot_sampled_signal(
+            time_axes,
             x_values=t,
             y_values=signal,
             line_color=YELLOW
         )
 
-        # Calculate and plot frequency spectrum
-        n_samples = len(signal)
-        fft_values = np.fft.fft(signal)
-        freqs = np.fft.fftfreq(n_samples, 1/sample_rate)
-        
-        # Only use positive frequencies and normalize magnitudes
-        pos_mask = freqs >= 0
-        freqs = freqs[pos_mask]
-        magnitudes = 2.0/n_samples * np.abs(fft_values[pos_mask])
+        # Positive frequencies with magnitudes normalized to the component amplitudes
+        freqs, magnitudes = data["freqs"], data["magnitudes"]
 
         # Create frequency domain plot
-        freq_plot = VGroup()
-        for freq, mag in zip(freqs[freqs <= 10], magnitudes[freqs <= 10]):
-            stem = Line(
-                freq_axes.c2p(freq, 0),
-                freq_axes.c2p(freq, mag),
-                color=RED
-            )
-            dot = Dot(freq_axes.c2p(freq, mag), color=RED)
-            freq_plot.add(stem, dot)
+        shown = freqs <= 10
+        freq_plot = StemPlot(freq_axes, freqs[shown], magnitudes[shown], color=RED)
 
         # Labels
         time_label = Text("Time Domain Signal", font_size=24).next_to(time_axes, UP)
@@ -220,8 +216,48 @@ class MathematicalFoundationScene(Scene):
         self.play(Write(explanation))
         self.wait(2)
 
+# Part 5b: Rotating phasors drawing a closed path
+class EpicycleScene(DraftScene, Scene):
+    def construct(self):
+        n_terms = scaled(500, 50)  # Rotating vectors; thousands still take one cumulative sum per frame
+        turn_time = 12  # Seconds for the chain to trace the whole path once
+
+        # Closed path from an SVG if one is given, otherwise a heart curve
+        svg_file = os.environ.get("FOURIER_EPICYCLE_SVG", "")
+        if os.path.exists(svg_file):
+            path = mobject_outline(SVGMobject(svg_file))
+        else:
+            s = np.linspace(0, TAU, scaled(2000, 256), endpoint=False)
+            path = 16 * np.sin(s)**3 + 1j * (
+                13 * np.cos(s) - 5 * np.cos(2*s) - 2 * np.cos(3*s) - np.cos(4*s)
+            )
+
+        # Centre the path and fit it in a 6 unit tall box
+        centre = (path.real.min() + path.real.max()) / 2 + 1j * (path.imag.min() + path.imag.max()) / 2
+        path = (path - centre) * 6 / max(np.ptp(path.real), np.ptp(path.imag))
+
+        # Coefficients c_k of path(t) = sum c_k e^(ik 2pi t), largest first
+        freqs, coeffs = fourier_series(path, n_terms)
+
+        title = Text("Fourier Series as Rotating Phasors", font_size=32).to_edge(UP)
+        euler_eq = MathTex("f(t) = \\sum_k c_k e^{i k 2\\pi t}", font_size=32).to_corner(DL)
+        epicycles = Epicycles(
+            freqs, coeffs, origin=DOWN * 0.4, n_circles=scaled(50, 10), n_trace_points=scaled(2048, 256)
+        )
+
+        # One tracker and one updater move the whole chain
+        time_tracker = ValueTracker(0)
+        epicycles.add_updater(lambda mob: mob.set_time(time_tracker.get_value()))
+
+        self.play(Write(title), Write(euler_eq))
+        self.add(epicycles)
+        self.play(time_tracker.animate.set_value(1), run_time=turn_time, rate_func=linear)
+        epicycles.clear_updaters()
+        self.play(FadeOut(epicycles.vectors), FadeOut(epicycles.circles))
+        self.wait(2)
+
 # Signal Decomposition Visualization
-class SignalDecompositionScene(Scene):
+class SignalDecompositionScene(DraftScene, Scene):
     def construct(self):
         # Create a more compact layout with 2x2 grid
         axes_group = VGroup()
@@ -248,20 +284,22 @@ class SignalDecompositionScene(Scene):
                 )
                 axes_group.add(ax)
 
-        # Define component signals
+        # Define component signals as (frequency, amplitude) sines, whose samples are
+        # cached and shared: sin(k*x) has frequency k/2pi
+        f = 1 / TAU
         signals = [
-            (lambda x: np.sin(x), "First Harmonic"),
-            (lambda x: 0.5 * np.sin(2*x), "Second Harmonic"),
-            (lambda x: 0.3 * np.sin(3*x), "Third Harmonic"),
-            (lambda x: np.sin(x) + 0.5*np.sin(2*x) + 0.3*np.sin(3*x), "Combined Signal")
+            ([(f, 1)], "First Harmonic"),
+            ([(2*f, 0.5)], "Second Harmonic"),
+            ([(3*f, 0.3)], "Third Harmonic"),
+            ([(f, 1), (2*f, 0.5), (3*f, 0.3)], "Combined Signal")
         ]
 
         # Create waves and labels
         waves = VGroup()
         labels = VGroup()
 
-        for i, (signal_func, label_text) in enumerate(signals):
-            wave = axes_group[i].plot(signal_func, color=YELLOW)
+        for i, (components, label_text) in enumerate(signals):
+            wave = plot_function(axes_group[i], components=components, color=YELLOW)
             waves.add(wave)
             
             label = Text(
@@ -300,25 +338,58 @@ class ConclusionScene(Scene):
         title = Text("Voice Frequency Analysis", font_size=36).to_edge(UP)
         
         # Create frequency ranges visualization
-        def create_range_viz(name, fund_range, harm_range):
-            return VGroup(
-                Text(name, font_size=24),
-                Line(
-                    start=LEFT*3,
-                    end=RIGHT*3,
+        def create_range_viz(name, recording, fund_range, harm_range):
+            # Use the measured spectrum when the recording is available
+            profile = None
+            if os.path.exists(recording):
+                try:
+                    profile = analyze_voice(recording)
+                except ValueError as error:  # Unsupported format or silence: keep the written ranges
+                    logger.warning(f"Not analyzing {recording}: {error}")
+            if profile is not None:
+                low, high = profile.fundamental_range
+                fund_range = f"{low:.0f}-{high:.0f} Hz"
+                harm_range = f"up to {profile.harmonic_limit:.0f} Hz"
+
+                spectrum_axes = Axes(
+                    x_range=[0, 5000, 1000],
+                    y_range=[0, 1, 0.5],
+                    x_length=5,
+                    y_length=1.2,
+                    axis_config={"color": BLUE, "stroke_width": 2, "tip_length": 0.15}
+                )
+                spectrum = Group(
+                    spectrum_axes,
+                    StemPlot(
+                        spectrum_axes,
+                        profile.freqs,
+                        profile.spectrum,
+                        color=YELLOW,
+                        stroke_width=1,
+                        marker_size=3
+                    )
+                )
+            else:
+                spectrum = Line(
+                    start=LEFT*2.5,
+                    end=RIGHT*2.5,
                     color=BLUE
-                ),
+                )
+
+            return Group(
+                Text(name, font_size=24),
+                spectrum,
                 Text(f"Fundamental: {fund_range}", font_size=20),
                 Text(f"Harmonics: {harm_range}", font_size=20)
             ).arrange(DOWN, buff=0.2)
 
-        # Create visualizations for each singer
-        singers = VGroup(
-            create_range_viz("Fayrouz", "250-450 Hz", "up to 5000 Hz"),
-            create_range_viz("Asmahan", "450 Hz", "Complex spectrum"),
-            create_range_viz("Laila Morad", "200-300 Hz", "up to 3000 Hz"),
-            create_range_viz("Shaban Abd Elraheem", "150-300 Hz", "Limited harmonics")
-        ).arrange(DOWN, buff=0.5)
+        # Create visualizations for each singer, 0-5 kHz like the MATLAB analysis
+        singers = Group(
+            create_range_viz("Fayrouz", "Fayrouz.wav", "250-450 Hz", "up to 5000 Hz"),
+            create_range_viz("Asmahan", "Asmahan.wav", "450 Hz", "Complex spectrum"),
+            create_range_viz("Laila Morad", "LailaMorad.wav", "200-300 Hz", "up to 3000 Hz"),
+            create_range_viz("Shaban Abd Elraheem", "ShabanAbdElraheem.wav", "150-300 Hz", "Limited harmonics")
+        ).arrange_in_grid(rows=2, cols=2, buff=(1, 0.5)).next_to(title, DOWN, buff=0.4)
 
         # Animations
         self.play(Write(title))
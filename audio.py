@@ -0,0 +1,183 @@
+from collections import namedtuple
+import struct
+
+import numpy as np
+
+from dsp import positive_freqs, window_magnitudes
+
+
+# Sample formats that can be memory-mapped directly: (format tag, bits) -> dtype
+WAV_DTYPES = {
+    (1, 8): np.uint8,
+    (1, 16): np.int16,
+    (1, 32): np.int32,
+    (3, 32): np.float32,
+    (3, 64): np.float64,
+}
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+PCM_24 = (1, 24)  # Has no numpy dtype, mapped as bytes and decoded by PCM24
+
+VoiceProfile = namedtuple(
+    "VoiceProfile",
+    ["freqs", "spectrum", "fundamental_range", "harmonic_limit"]
+)
+
+
+class PCM24:
+    """Memory-mapped 24-bit PCM that decodes to int32 when sliced
+
+    Samples are shifted to the top of the int32 range, so they convert to
+    floats like any other integer format"""
+    dtype = np.dtype(np.int32)
+
+    def __init__(self, raw):
+        self.raw = raw  # (frames x channels x 3) little-endian bytes
+        self.shape = raw.shape[:2]
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, index):
+        raw = np.asarray(self.raw[index])
+        padded = np.zeros(raw.shape[:-1] + (4,), dtype=np.uint8)
+        padded[..., 1:] = raw  # A zero low byte makes the value sample << 8
+        return padded.view("<i4")[..., 0]
+
+    def __array__(self, dtype=None, copy=None):
+        samples = self[:]
+        return samples if dtype is None else samples.astype(dtype)
+
+
+def read_wav(path):
+    """Memory-map the sample data of a WAV file without loading it
+
+    Returns a read-only (frames x channels) array backed by the file (a
+    PCM24 for 24-bit files) and the sample rate. Only the RIFF header is
+    parsed in Python"""
+    with open(path, "rb") as wav_file:
+        riff, _, wave = struct.unpack("<4sI4s", wav_file.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"{path} is not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            header = wav_file.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack("<4sI", header)
+
+            if chunk_id == b"fmt ":
+                fmt = wav_file.read(chunk_size)
+                wav_file.seek(chunk_size % 2, 1)  # Chunks are word aligned
+            elif chunk_id == b"data":
+                data_offset = wav_file.tell()
+                break
+            else:
+                wav_file.seek(chunk_size + chunk_size % 2, 1)
+
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk before its data")
+    format_tag, n_channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == WAVE_FORMAT_EXTENSIBLE:
+        format_tag = struct.unpack("<H", fmt[24:26])[0]  # Sub-format GUID starts with the tag
+    n_frames = chunk_size // block_align
+    if (format_tag, bits) == PCM_24 and block_align == 3 * n_channels:
+        raw = np.memmap(path, dtype=np.uint8, mode="r", offset=data_offset,
+                        shape=(n_frames, n_channels, 3))
+        return PCM24(raw), sample_rate
+    if (format_tag, bits) not in WAV_DTYPES:
+        raise ValueError(f"Unsupported WAV sample format in {path}: tag {format_tag}, {bits} bits")
+
+    samples = np.memmap(
+        path,
+        dtype=np.dtype(WAV_DTYPES[format_tag, bits]).newbyteorder("<"),
+        mode="r",
+        offset=data_offset,
+        shape=(n_frames, n_channels)
+    )
+    return samples, sample_rate
+
+
+def to_mono_float(samples):
+    """Convert a block of (frames x channels) samples to mono floats in [-1, 1]"""
+    block = np.asarray(samples, dtype=np.float64).mean(axis=1)  # Average the channels
+    if samples.dtype == np.uint8:
+        return (block - 128) / 128
+    if samples.dtype.kind == "i":
+        return block / -np.iinfo(samples.dtype).min
+    return block
+
+
+def iter_frame_spectra(samples, window_size, hop_size, frames_per_chunk=256):
+    """Yield (frames x bins) magnitude blocks for every window of a long recording
+
+    Reads the memory-mapped samples one chunk at a time, so memory stays
+    bounded by frames_per_chunk windows regardless of the file length"""
+    n_samples = len(samples)
+    chunk_hops = frames_per_chunk * hop_size
+    for chunk_start in range(0, n_samples - window_size + 1, chunk_hops):
+        # Windows starting in this chunk may reach up to window_size past it
+        chunk_end = min(chunk_start + chunk_hops - hop_size + window_size, n_samples)
+        chunk = to_mono_float(samples[chunk_start:chunk_end])
+        starts = np.arange(0, len(chunk) - window_size + 1, hop_size)
+        yield window_magnitudes(chunk, window_size, starts)
+
+
+def estimate_fundamentals(spectra, freqs, min_freq=70, max_freq=1000, n_harmonics=4):
+    """Estimate the fundamental of every frame with the harmonic product spectrum"""
+    n_bins = spectra.shape[1] // n_harmonics
+    log_spectra = np.log(spectra + 1e-12)
+    product = log_spectra[:, :n_bins].copy()
+
+    # freqs[k] is k + 1 bins, so harmonic h of bin k lands near index h*(k+1) - 1.
+    # The bin rounding error grows with h, so take the peak within h/2 bins of it
+    bins = np.arange(1, n_bins + 1)
+    for harmonic in range(2, n_harmonics + 1):
+        spread = np.arange(-(harmonic // 2), harmonic // 2 + 1)
+        near = np.clip((harmonic * bins - 1)[:, np.newaxis] + spread, 0, spectra.shape[1] - 1)
+        product += log_spectra[:, near].max(axis=2)
+
+    search = (freqs[:n_bins] >= min_freq) & (freqs[:n_bins] <= max_freq)
+    best = np.flatnonzero(search)[product[:, search].argmax(axis=1)]
+    return freqs[best]
+
+
+def analyze_voice(path, window_size=4096, max_freq=5000, harmonic_floor_db=-40):
+    """Long-term average spectrum and pitch estimates of a voice recording
+
+    Streams the recording through the same batched window FFT as the
+    animations and returns a VoiceProfile with the spectrum up to max_freq
+    (normalized to a peak of 1), the 10th-90th percentile fundamental range
+    of voiced frames and the highest frequency within harmonic_floor_db of
+    the spectral peak"""
+    samples, sample_rate = read_wav(path)
+    freqs = positive_freqs(window_size, sample_rate)
+
+    power_sum = np.zeros(len(freqs))
+    n_frames = 0
+    fundamentals = []
+    for spectra in iter_frame_spectra(samples, window_size, window_size // 2):
+        energy = (spectra ** 2).sum(axis=1)
+        power_sum += (spectra ** 2).sum(axis=0)
+        n_frames += len(spectra)
+
+        # Frames well below the chunk's loudest one are treated as unvoiced
+        voiced = energy > 0.1 * energy.max()
+        if voiced.any():
+            fundamentals.append(estimate_fundamentals(spectra[voiced], freqs))
+
+    if n_frames == 0:
+        raise ValueError(f"{path} is shorter than one analysis window")
+    if not fundamentals:
+        raise ValueError(f"{path} has no voiced frames to estimate a pitch from")
+
+    spectrum = np.sqrt(power_sum / n_frames)
+    shown = freqs <= max_freq
+    spectrum = spectrum[shown] / spectrum[shown].max()
+
+    fundamentals = np.concatenate(fundamentals)
+    fundamental_range = tuple(np.percentile(fundamentals, [10, 90]))
+
+    above_floor = np.flatnonzero(20 * np.log10(spectrum + 1e-12) >= harmonic_floor_db)
+    harmonic_limit = freqs[shown][above_floor[-1]]
+    return VoiceProfile(freqs[shown], spectrum, fundamental_range, harmonic_limit)
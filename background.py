@@ -0,0 +1,114 @@
+"""Cached static backgrounds for long animation loops
+
+Within one play, manim's Cairo renderer rasterizes the mobjects that do
+not move once, as long as they are drawn before every moving mobject,
+and only redraws the moving ones on top of that image each frame.
+CachedBackgroundScene extends this across plays and makes it safe:
+
+* The background image is kept between plays and reused while a
+  fingerprint of its mobjects (points, colours, stroke widths, z-index,
+  image pixels) and of the camera is unchanged, so axes, numbers and
+  plots are rasterized once for a whole loop of plays.
+* The fingerprints are checked before every frame. When a background
+  mobject changes during a play, for example from another mobject's
+  updater, it and everything drawn after it are redrawn every frame for
+  the rest of the play and the background is rebuilt without them.
+
+Other renderers are left alone.
+"""
+import hashlib
+
+import numpy as np
+
+
+# Mobject attributes that determine how it is rasterized
+ARRAY_ATTRIBUTES = (
+    "points", "fill_rgbas", "stroke_rgbas", "background_stroke_rgbas", "rgbas",
+    "sheen_direction", "pixel_array",
+)
+SCALAR_ATTRIBUTES = ("z_index", "stroke_width", "background_stroke_width", "sheen_factor")
+
+
+def mobject_fingerprint(mobject):
+    """Digest of everything that affects how one mobject (without its family) is drawn"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in ARRAY_ATTRIBUTES:
+        value = getattr(mobject, name, None)
+        if value is not None:
+            digest.update(np.ascontiguousarray(value).data)
+    digest.update(repr([getattr(mobject, name, None) for name in SCALAR_ATTRIBUTES]).encode())
+    return digest.digest()
+
+
+def camera_fingerprint(camera):
+    """What the background depends on besides its mobjects"""
+    return repr([
+        np.asarray(getattr(camera, name, None)).tolist()
+        for name in ("frame_center", "frame_width", "frame_height", "pixel_width",
+                     "pixel_height", "background_color", "background_opacity")
+    ])
+
+
+class CachedBackgroundScene:
+    """Mixin keeping the rasterized static background of a Scene between frames and plays"""
+    check_background_every_frame = True
+
+    def setup(self):
+        super().setup()
+        self.background_stats = {"rasterized": 0, "reused": 0, "invalidated": 0}
+        self._background = None  # (key, image) of the last rasterized background
+        self._static_fingerprints = []
+
+        renderer = self.renderer
+        if not hasattr(renderer, "save_static_frame_data"):  # Only Cairo keeps a static frame
+            return
+        save_static_frame_data = renderer.save_static_frame_data
+        render_frame = renderer.render
+
+        def cached_save_static_frame_data(scene, static_mobjects):
+            self._static_fingerprints = [mobject_fingerprint(mobject) for mobject in static_mobjects]
+            key = (
+                camera_fingerprint(renderer.camera),
+                [id(mobject) for mobject in static_mobjects],
+                self._static_fingerprints,
+            )
+            if self._background is not None and self._background[0] == key:
+                self.background_stats["reused"] += 1
+                renderer.static_image = self._background[1]
+                return renderer.static_image
+
+            self.background_stats["rasterized"] += 1
+            image = save_static_frame_data(scene, static_mobjects)
+            self._background = (key, image)
+            return image
+
+        def checked_render(scene, time, moving_mobjects):
+            if self.check_background_every_frame and self._background_changed():
+                moving_mobjects = scene.moving_mobjects  # The list passed in predates the change
+            return render_frame(scene, time, moving_mobjects)
+
+        renderer.save_static_frame_data = cached_save_static_frame_data
+        renderer.render = checked_render
+
+    def _background_changed(self):
+        """Move changed background mobjects and everything above them to the moving list"""
+        static = list(getattr(self, "static_mobjects", None) or [])
+        if not static or len(static) != len(self._static_fingerprints):
+            return False
+        for index, (mobject, fingerprint) in enumerate(zip(static, self._static_fingerprints)):
+            if mobject_fingerprint(mobject) != fingerprint:
+                break
+        else:
+            return False
+
+        # Static mobjects all come before the moving ones in drawing order
+        self.background_stats["invalidated"] += 1
+        self.moving_mobjects = static[index:] + list(self.moving_mobjects)
+        self.static_mobjects = static[:index]
+        self.renderer.save_static_frame_data(self, self.static_mobjects)
+        return True
+
+
+def with_cached_background(scene_class):
+    """Subclass of scene_class that caches its static background"""
+    return type(scene_class.__name__, (CachedBackgroundScene, scene_class), {})
@@ -0,0 +1,283 @@
+"""Benchmarks for the DSP paths and the construction and rendering of every scene
+
+    python benchmarks.py -o bench.json                 # everything
+    python benchmarks.py --dsp-only -o bench.json      # no manim needed
+    python benchmarks.py -o after.json --compare before.json
+
+DSP cases time the spectrum code paths over a range of signal lengths and
+window counts, and every installed FFT backend on the window sizes the
+scenes and the audio analysis use. Scene cases time construct (animations skipped) separately
+from frame rendering at low quality, and record mobject counts and the
+peak Python/NumPy memory of construct. Results are written as JSON so two
+runs can be compared for regressions.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+import numpy as np
+
+from dsp import (
+    get_signal_points,
+    get_spectrum,
+    sliding_dft_magnitudes,
+    stft_magnitudes,
+    window_magnitudes,
+)
+import fft_backend
+from render_all import SCENE_FILES, find_scenes, load_scene_class
+
+
+# DSP workload grid: test signal durations (s) and sliding-window position counts
+DURATIONS = [2, 20, 200]
+WINDOW_COUNTS = [20, 500, 5000]
+SAMPLE_RATE = 1000
+WINDOW_WIDTH = 0.5
+
+# FFT backend comparison: window lengths of the FFT scene, the spectrum CLI,
+# streaming (50 ms at 44.1 kHz) and voice analysis, batched like a spectrogram
+FFT_WINDOW_SIZES = [50, 500, 2205, 4096]
+FFT_BATCH_SIZES = [1, 256, 4096]
+
+# Keys identifying a result, so runs can be matched up when comparing
+IDENTITY_KEYS = ("case", "backend", "scene", "duration", "n_window", "n_positions", "n_samples")
+
+
+def best_time(func, repeat=3):
+    """Best seconds per call, with the number of calls per run picked by timeit"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def spectrum_block(signal, sample_rate):
+    """The inline spectrum block FourierTransformScene used before get_spectrum"""
+    n_samples = len(signal)
+    fft_values = np.fft.fft(signal)
+    freqs = np.fft.fftfreq(n_samples, 1/sample_rate)
+    pos_mask = freqs >= 0
+    return freqs[pos_mask], 2.0/n_samples * np.abs(fft_values[pos_mask])
+
+
+def sliding_window_loop(signal, sample_rate, window_width, window_positions):
+    """The per-window loop the FFT scene ran before stft_magnitudes, with its original get_fft"""
+    spectra = []
+    for wx in window_positions:
+        start_idx = int(wx * sample_rate)
+        end_idx = int((wx + window_width) * sample_rate)
+        window = signal[start_idx:end_idx]
+        # Full complex FFT, then the positive half selected with a mask
+        fft_vals = np.fft.fft(window)
+        fft_freqs = np.fft.fftfreq(len(window), 1/sample_rate)
+        pos_mask = fft_freqs > 0
+        spectra.append(np.abs(fft_vals)[pos_mask])
+    return spectra
+
+
+def bench_dsp():
+    results = []
+    for duration in DURATIONS:
+        t = np.linspace(0, duration, int(duration * SAMPLE_RATE))
+        signal = get_signal_points(t)
+
+        for case, func in [("spectrum_block", spectrum_block), ("get_spectrum", get_spectrum)]:
+            results.append({
+                "case": case,
+                "n_samples": len(signal),
+                "seconds": best_time(lambda: func(signal, SAMPLE_RATE)),
+            })
+
+        for n_positions in WINDOW_COUNTS:
+            window_positions = np.linspace(0, duration - WINDOW_WIDTH, n_positions)
+            cases = [
+                ("sliding_window_loop", sliding_window_loop),
+                ("stft_magnitudes", stft_magnitudes),
+            ]
+            for case, func in cases:
+                results.append({
+                    "case": case,
+                    "duration": duration,
+                    "n_positions": n_positions,
+                    "seconds": best_time(
+                        lambda: func(signal, SAMPLE_RATE, WINDOW_WIDTH, window_positions)
+                    ),
+                })
+
+            # Sliding DFT needs whole-sample hops, tracking the displayed 0-10 Hz bins
+            hop = max(1, int((duration - WINDOW_WIDTH) * SAMPLE_RATE) // (n_positions - 1))
+            results.append({
+                "case": "sliding_dft_magnitudes",
+                "duration": duration,
+                "n_positions": n_positions,
+                "seconds": best_time(
+                    lambda: sliding_dft_magnitudes(
+                        signal, SAMPLE_RATE, WINDOW_WIDTH, hop, n_positions, max_freq=10
+                    )
+                ),
+            })
+            print(f"  dsp: {duration}s signal, {n_positions} windows")
+    return results
+
+
+def bench_fft_backends(names=None):
+    """Time batched window spectra with every installed FFT backend"""
+    results = []
+    previous = fft_backend.get_backend()
+    rng = np.random.default_rng(0)
+    try:
+        for name in names or fft_backend.BACKENDS:
+            try:
+                backend = fft_backend.set_backend(name)
+            except ImportError:
+                print(f"  fft: {name} not installed, skipped")
+                continue
+            for n_window in FFT_WINDOW_SIZES:
+                for n_positions in FFT_BATCH_SIZES:
+                    signal = rng.standard_normal(n_window * n_positions)
+                    starts = np.arange(n_positions) * n_window
+                    results.append({
+                        "case": "fft_backend",
+                        "backend": name,
+                        "workers": backend.workers,
+                        "n_window": n_window,
+                        "n_positions": n_positions,
+                        "seconds": best_time(lambda: window_magnitudes(signal, n_window, starts)),
+                    })
+            print(f"  fft: {name}")
+    finally:
+        fft_backend._backend = previous
+    return results
+
+
+def bench_scene(path, scene_name):
+    """Time construct and frame rendering of one scene at low quality"""
+    from manim import tempconfig
+
+    scene_class = load_scene_class(path, scene_name)
+    settings = {
+        "quality": "low_quality",
+        "input_file": path,
+        "verbosity": "WARNING",
+        "write_to_movie": False,  # Frames are rendered but not encoded
+        "disable_caching": True,
+    }
+
+    def render(extra=None):
+        with tempconfig({**settings, **(extra or {})}):
+            scene = scene_class()
+            start = time.perf_counter()
+            scene.render()
+            return scene, time.perf_counter() - start
+
+    # Untimed first render, so Text/MathTex files and array caches are warm for every timing
+    render()
+
+    # save_last_frame skips every animation, leaving construct plus one still frame
+    scene, construct_seconds = render({"save_last_frame": True})
+    _, total_seconds = render()
+
+    # Peak memory from a run of its own, as tracing slows everything it measures
+    tracemalloc.start()
+    render({"save_last_frame": True})
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "case": "scene",
+        "scene": scene_name,
+        "construct_seconds": construct_seconds,
+        "frames_seconds": total_seconds - construct_seconds,
+        "total_seconds": total_seconds,
+        "top_level_mobjects": len(scene.mobjects),
+        "family_mobjects": sum(len(mobject.get_family()) for mobject in scene.mobjects),
+        "peak_memory_mb": peak_bytes / 2**20,
+    }
+
+
+def bench_scenes(scene_names=None):
+    results = []
+    for path, scene_name in find_scenes(SCENE_FILES, on_demand=bool(scene_names)):
+        if scene_names and scene_name not in scene_names:
+            continue
+        results.append(bench_scene(path, scene_name))
+        print(f"  scene: {scene_name} {results[-1]['total_seconds']:.2f}s")
+    return results
+
+
+def environment():
+    from importlib import metadata
+
+    versions = {}
+    for package in ("numpy", "scipy", "pyFFTW", "manim"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "fft_backend": fft_backend.get_backend().name,
+        **versions
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print timing ratios against a baseline run, returning the regressed cases"""
+    def identity(record):
+        return tuple(record.get(key) for key in IDENTITY_KEYS)
+
+    previous = {identity(record): record for record in baseline["results"]}
+    regressions = []
+    for record in results:
+        old = previous.get(identity(record))
+        if old is None:
+            continue
+        for field, value in record.items():
+            if not field.endswith("seconds") or not old.get(field):
+                continue
+            ratio = value / old[field]
+            name = " ".join(str(part) for part in identity(record) if part is not None)
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"  {name:<40}{field:<20}{ratio:6.2f}x{flag}")
+            if flag:
+                regressions.append((name, field, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DSP paths and scene rendering")
+    parser.add_argument("-o", "--output", default="bench.json")
+    parser.add_argument("--dsp-only", action="store_true", help="Skip the manim scene benchmarks")
+    parser.add_argument("--scenes", nargs="+", help="Only benchmark these scenes")
+    parser.add_argument("--backends", nargs="+", choices=fft_backend.BACKENDS,
+                        help="FFT backends to compare (default: all installed)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+
+    print("Benchmarking DSP paths")
+    results = bench_dsp()
+    print("Comparing FFT backends")
+    results += bench_fft_backends(args.backends)
+    if not args.dsp_only:
+        print("Benchmarking scenes")
+        results += bench_scenes(args.scenes)
+
+    with open(args.output, "w") as output:
+        json.dump({"environment": environment(), "results": results}, output, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
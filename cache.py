@@ -0,0 +1,108 @@
+"""Content-addressed cache for sampled signals and spectra
+
+Results are keyed by a hash of what produced them (the kind of result and
+its parameters: components, time range, sample rate, window settings), so
+any scene asking for the same arrays gets the same entry. Entries live in
+memory with least-recently-used eviction and, when a cache directory is
+configured, are also written to disk as .npz files so the next render
+reuses them.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+def _canonical(value):
+    """Tuples become lists and all numbers floats, so 2 and 2.0 compare equal"""
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def params_key(params):
+    """Canonical JSON form of a parameter set"""
+    return json.dumps(_canonical(params), sort_keys=True)
+
+
+def content_key(kind, params):
+    """Hash identifying the arrays of one kind computed from params"""
+    return hashlib.sha256(f"{kind}:{params_key(params)}".encode()).hexdigest()
+
+
+class ArrayCache:
+    """LRU cache of dicts of NumPy arrays with optional on-disk persistence"""
+    def __init__(self, max_bytes=256 * 2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, kind, params, compute):
+        """Arrays for (kind, params), calling compute() only on a miss
+
+        compute must return a dict of arrays. Returned arrays are shared
+        between callers and therefore read-only"""
+        key = content_key(kind, params)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        arrays = self._load(key)
+        if arrays is None:
+            self.misses += 1
+            arrays = {name: np.asarray(value) for name, value in compute().items()}
+            self._save(key, arrays)
+        else:
+            self.hits += 1
+
+        for value in arrays.values():
+            value.setflags(write=False)
+        self._insert(key, arrays)
+        return arrays
+
+    def clear(self):
+        """Drop every in-memory entry (files on disk are kept)"""
+        self.entries.clear()
+        self.n_bytes = 0
+
+    def _insert(self, key, arrays):
+        self.entries[key] = arrays
+        self.n_bytes += sum(value.nbytes for value in arrays.values())
+
+        # Evict least recently used entries, but always keep the newest one
+        while self.n_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.n_bytes -= sum(value.nbytes for value in evicted.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def _load(self, key):
+        if self.directory is None or not os.path.exists(self._path(key)):
+            return None
+        with np.load(self._path(key)) as stored:
+            return {name: stored[name] for name in stored.files}
+
+    def _save(self, key, arrays):
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write to a temporary file first so concurrent renders never read a partial entry
+        temporary = self._path(key) + f".{os.getpid()}.tmp.npz"
+        np.savez(temporary, **arrays)
+        os.replace(temporary, self._path(key))
+
+
+# Shared by all scenes in a process; set FOURIER_CACHE_DIR to persist between renders
+CACHE = ArrayCache(directory=os.environ.get("FOURIER_CACHE_DIR"))
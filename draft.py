@@ -0,0 +1,94 @@
+"""Draft mode: less sampling and geometry for preview renders
+
+    manim -ql animation.py FourierTransformScene    # drafted automatically
+    FOURIER_DRAFT=off manim -ql animation.py ...     # full detail at any quality
+    FOURIER_DRAFT=on manim -qh animation.py ...      # draft detail at any quality
+
+The sample rates, window positions, displayed bins, Fourier terms and
+curve resolutions written in the scenes are those of a final render
+(1080p and up). A DraftScene multiplies them by its detail factor, the
+rendered height over 1080: 0.44 at -ql, 0.67 at -qm and 1 from -qh on,
+never going below a floor that keeps the picture correct (such as the
+Nyquist rate of the signal). The draft setting of a scene class, or the
+"draft" entry of its params, overrides FOURIER_DRAFT.
+"""
+import os
+
+
+# Output height at which scenes get their full detail
+FULL_DETAIL_HEIGHT = 1080
+
+# Output heights of manim's quality presets, for drivers that do not import manim
+QUALITY_HEIGHTS = {
+    "low_quality": 480,
+    "medium_quality": 720,
+    "high_quality": 1080,
+    "production_quality": 1440,
+    "fourk_quality": 2160,
+}
+
+# Scene data parameters that scale with the detail, and the least each may be drafted to
+DRAFT_MINIMUMS = {
+    "FourierTransformScene": {"sample_rate": 100, "zoom_bins": 16},
+    "FFT": {"n_positions": 4, "zoom_bins": 16},
+}
+
+_detail = 1.0  # Detail factor of the scene being constructed
+
+
+def detail(setting=None, pixel_height=None):
+    """Factor in (0, 1] to scale workloads by: 1 for final renders, less for drafts
+
+    setting is "auto", "on" or "off" (True and False also work); None
+    reads FOURIER_DRAFT, which defaults to "auto". pixel_height defaults
+    to the height manim renders at"""
+    if setting is None:
+        setting = os.environ.get("FOURIER_DRAFT", "auto")
+    setting = {True: "on", False: "off"}.get(setting, str(setting).lower())
+    if setting not in ("auto", "on", "off"):
+        raise ValueError(f"Draft setting must be auto, on or off, not {setting!r}")
+    if setting == "off":
+        return 1.0
+
+    if pixel_height is None:
+        from manim import config
+        pixel_height = config.pixel_height
+    if setting == "on":
+        pixel_height = min(pixel_height, QUALITY_HEIGHTS["low_quality"])
+    return min(1.0, pixel_height / FULL_DETAIL_HEIGHT)
+
+
+def current_detail():
+    """Detail factor of the DraftScene being constructed (1 outside of one)"""
+    return _detail
+
+
+def scaled(count, minimum=1, factor=None):
+    """count scaled by the detail factor, but not below minimum (nor above count)"""
+    factor = _detail if factor is None else factor
+    return min(count, max(minimum, int(round(count * factor))))
+
+
+def draft_params(scene_name, params, factor=None):
+    """Scene data parameters with every count in DRAFT_MINIMUMS scaled by the detail factor"""
+    params = dict(params)
+    for name, minimum in DRAFT_MINIMUMS.get(scene_name, {}).items():
+        if params.get(name) is not None:
+            params[name] = scaled(params[name], minimum, factor)
+    return params
+
+
+class DraftScene:
+    """Mixin setting the detail factor of a Scene from its draft setting and the quality"""
+    draft = None  # "auto", "on" or "off"; None follows FOURIER_DRAFT
+
+    def setup(self):
+        global _detail
+        super().setup()
+        setting = getattr(self, "params", {}).get("draft")
+        self.detail = _detail = detail(self.draft if setting is None else setting)
+
+    def tear_down(self):
+        global _detail
+        super().tear_down()
+        _detail = 1.0
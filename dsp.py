@@ -0,0 +1,556 @@
+"""Signal and spectrum computations shared by the scenes
+
+This module only depends on NumPy, so spectra and STFT matrices can be
+computed and exported on machines without a rendering stack:
+
+    python dsp.py spectrum --duration 2 --sample-rate 1000 -o spectrum.npz
+    python dsp.py stft --sample-rate 100 --window-width 0.5 -o stft.npz
+    python dsp.py scenes
+
+The scenes pick up arrays written by the `scenes` command from
+PRECOMPUTED_DIR instead of recomputing them on every render.
+"""
+import argparse
+import inspect
+import os
+
+import numpy as np
+
+from cache import CACHE, params_key
+from fft_backend import get_backend
+
+
+# Composite test signal used throughout the animations: (frequency in Hz, amplitude)
+COMPONENTS = [(2, 1.0), (5, 0.5), (8, 0.3)]
+
+# Where the scenes look for arrays exported by `python dsp.py scenes`
+PRECOMPUTED_DIR = os.environ.get("FOURIER_PRECOMPUTED_DIR", "precomputed")
+
+
+def get_component_points(t, freq, amplitude=1):
+    """Generate a single sine wave with given frequency and amplitude"""
+    return amplitude * np.sin(2 * np.pi * freq * t)
+
+
+def get_signal_points(t, components=COMPONENTS):
+    """Generate a complex signal as the sum of (frequency, amplitude) sine waves"""
+    t = np.asarray(t, dtype=float)
+    signal = np.zeros_like(t)
+    for freq, amplitude in components:
+        signal += get_component_points(t, freq, amplitude)
+    return signal
+
+
+def get_fft(signal, sample_rate):
+    """Compute the Fast Fourier Transform of the signal
+    Returns positive frequencies and their magnitudes"""
+    n_bins = (len(signal) - 1) // 2  # Only keep positive frequencies
+    fft_vals = get_backend().rfft(signal)  # Real input needs only half the spectrum
+    return positive_freqs(len(signal), sample_rate), np.abs(fft_vals[1:n_bins + 1])
+
+
+def get_spectrum(signal, sample_rate, band=None):
+    """One-sided amplitude spectrum including DC
+
+    Magnitudes are scaled by 2/N, so a sine of amplitude A peaks at A. With
+    band=(f_start, f_stop, n_bins) only that band is evaluated, at any
+    resolution, instead of the FFT bins"""
+    n_samples = len(signal)
+    if band is not None:
+        freqs, magnitudes = band_magnitudes(signal, sample_rate, *band)
+        return freqs, 2.0/n_samples * magnitudes
+    freqs = np.fft.rfftfreq(n_samples, 1/sample_rate)
+    magnitudes = 2.0/n_samples * np.abs(get_backend().rfft(signal))
+    # Match np.fft.fftfreq(n) >= 0, which has no Nyquist bin for even lengths
+    n_bins = (n_samples + 1) // 2
+    return freqs[:n_bins], magnitudes[:n_bins]
+
+
+def positive_freqs(n_window, sample_rate):
+    """Frequencies of the bins returned by window_magnitudes
+
+    Same bins as np.fft.fftfreq(n) > 0: DC and the Nyquist bin are dropped"""
+    n_bins = (n_window - 1) // 2
+    return np.fft.rfftfreq(n_window, 1/sample_rate)[1:n_bins + 1]
+
+
+def gather_windows(signal, n_window, start_indices, out=None):
+    """(positions x samples) array of equally long windows of the signal
+
+    Built from a strided view, so only the requested windows are copied,
+    into out when given"""
+    starts = np.clip(np.asarray(start_indices, dtype=int), 0, len(signal) - n_window)
+    view = np.lib.stride_tricks.sliding_window_view(signal, n_window)
+    if out is None:
+        return view[starts]
+    if n_window < 1024:
+        out[...] = view[starts]
+    else:  # Long windows: copying row by row skips the temporary array
+        for row, start in zip(out, starts):
+            row[:] = signal[start:start + n_window]
+    return out
+
+
+def window_magnitudes(signal, n_window, start_indices):
+    """Magnitude spectra of equally long windows in one batched FFT
+
+    Runs a single rfft over the gathered (positions x samples) array and
+    returns the (positions x bins) magnitude matrix for positive_freqs.
+    Windows are gathered into the FFT backend's reusable buffer"""
+    fft = get_backend()
+    signal = np.asarray(signal, dtype=float)
+    windows = fft.buffer((len(start_indices), n_window))
+    gather_windows(signal, n_window, start_indices, out=windows)
+    n_bins = (n_window - 1) // 2
+    return np.abs(fft.rfft(windows)[:, 1:n_bins + 1])
+
+
+def goertzel_magnitudes(windows, sample_rate, freqs):
+    """DFT magnitudes at a few arbitrary frequencies with the Goertzel recurrence
+
+    Works on the last axis of windows and is vectorized over frequencies
+    and windows. Costs O(samples) per frequency instead of a full FFT"""
+    windows = np.asarray(windows, dtype=float)
+    omega = 2 * np.pi * np.asarray(freqs, dtype=float) / sample_rate
+    coeff = 2 * np.cos(omega)
+
+    # s[n] = x[n] + 2cos(w) s[n-1] - s[n-2], for every (window, frequency) pair
+    s_prev = np.zeros(windows.shape[:-1] + omega.shape)
+    s_prev2 = np.zeros_like(s_prev)
+    for sample in np.moveaxis(windows, -1, 0):
+        s_prev, s_prev2 = sample[..., np.newaxis] + coeff * s_prev - s_prev2, s_prev
+
+    # |X(w)|^2 from the last two states of the recurrence
+    power = s_prev**2 + s_prev2**2 - coeff * s_prev * s_prev2
+    return np.sqrt(np.maximum(power, 0))
+
+
+def czt_magnitudes(windows, sample_rate, f_start, f_stop, n_bins):
+    """DFT magnitudes on n_bins evenly spaced frequencies of [f_start, f_stop]
+
+    Chirp-z (Bluestein) zoom transform: three FFTs of length about
+    samples + n_bins, independent of how finely the band is resolved"""
+    windows = np.asarray(windows, dtype=float)
+    n_samples = windows.shape[-1]
+    n = np.arange(n_samples)
+
+    # X[k] = sum_n x[n] A^-n W^nk with A = e^(i 2pi f_start / fs)
+    step = (f_stop - f_start) / max(n_bins - 1, 1)
+    w_phase = -2 * np.pi * step / sample_rate
+    a_phase = 2 * np.pi * f_start / sample_rate
+
+    # nk = (n^2 + k^2 - (k - n)^2) / 2 turns the sum into a convolution
+    fft_len = 1 << int(np.ceil(np.log2(n_samples + n_bins - 1)))
+    pre = np.exp(1j * (-a_phase * n + w_phase * n**2 / 2))
+    m = np.arange(-(n_samples - 1), n_bins)
+    chirp = np.exp(-1j * w_phase * m**2 / 2)
+
+    fft = get_backend()
+    chirp_spectrum = fft.fft(chirp, fft_len).copy()  # Backends may reuse their output arrays
+    convolved = fft.ifft(
+        fft.fft(windows * pre, fft_len) * chirp_spectrum
+    )[..., n_samples - 1:n_samples - 1 + n_bins]
+    return np.abs(convolved)  # The post-chirp W^(k^2/2) has unit magnitude
+
+
+# Up to this many bins Goertzel is cheaper than the three FFTs of the chirp-z transform
+GOERTZEL_MAX_BINS = 8
+
+
+def band_magnitudes(windows, sample_rate, f_start, f_stop, n_bins):
+    """Spectrum of only the displayed band at a chosen resolution
+
+    Returns the n_bins frequencies of [f_start, f_stop] and the magnitudes
+    of every window there, using Goertzel for a few bins and the chirp-z
+    transform for dense bands"""
+    freqs = np.linspace(f_start, f_stop, n_bins)
+    if n_bins <= GOERTZEL_MAX_BINS:
+        return freqs, goertzel_magnitudes(windows, sample_rate, freqs)
+    return freqs, czt_magnitudes(windows, sample_rate, f_start, f_stop, n_bins)
+
+
+def stft_magnitudes(signal, sample_rate, window_width, window_starts, band=None):
+    """Compute the spectrum of every window position in one batched transform
+
+    Window width and start positions are given in seconds. Returns the
+    positive frequencies plus a (positions x bins) magnitude matrix. With
+    band=(f_start, f_stop, n_bins) only that band is evaluated"""
+    n_window = int(round(window_width * sample_rate))  # Samples per window
+    starts = np.rint(np.asarray(window_starts) * sample_rate).astype(int)
+    if band is not None:
+        return band_magnitudes(gather_windows(signal, n_window, starts), sample_rate, *band)
+    return positive_freqs(n_window, sample_rate), window_magnitudes(signal, n_window, starts)
+
+
+class SlidingDFT:
+    """Spectrum of a window sliding over a signal, updated hop by hop
+
+    Tracks only the requested DFT bins of an n_window long window. Moving
+    the window by one sample costs O(bins) instead of a new FFT:
+    X_k <- (X_k + x[start + N] - x[start]) * e^(i 2pi k / N). The bins are
+    recomputed from scratch every resync_interval samples so rounding
+    errors cannot accumulate"""
+    def __init__(self, signal, n_window, bins, resync_interval=4096):
+        self.signal = np.asarray(signal, dtype=float)
+        self.n_window = n_window
+        self.bins = np.asarray(bins)
+        self.twiddle = np.exp(2j * np.pi * self.bins / n_window)
+        self.resync_interval = resync_interval
+        self.start = 0
+        self.resync()
+
+    def resync(self):
+        """Recompute the tracked bins of the current window exactly"""
+        window = self.signal[self.start:self.start + self.n_window]
+        self.values = get_backend().rfft(window)[self.bins]
+        self.since_resync = 0
+
+    def advance(self, hop=1):
+        """Slide the window hop samples to the right"""
+        hop = min(hop, len(self.signal) - self.n_window - self.start)
+        if hop <= 0:
+            return self
+        if self.since_resync + hop >= self.resync_interval:
+            self.start += hop
+            self.resync()
+            return self
+
+        # All hop single-sample updates at once:
+        # X' = T^hop X + sum_j (x[start + N + j] - x[start + j]) T^(hop - j)
+        entering = self.signal[self.start + self.n_window:self.start + self.n_window + hop]
+        leaving = self.signal[self.start:self.start + hop]
+        powers = self.twiddle[:, np.newaxis] ** np.arange(hop, 0, -1)
+        self.values = self.twiddle**hop * self.values + powers @ (entering - leaving)
+
+        self.start += hop
+        self.since_resync += hop
+        return self
+
+    def magnitudes(self):
+        return np.abs(self.values)
+
+
+def sliding_dft_magnitudes(signal, sample_rate, window_width, hop, n_positions,
+                           max_freq=None, resync_interval=4096):
+    """Spectra of n_positions windows spaced hop samples apart, via SlidingDFT
+
+    A drop-in alternative to stft_magnitudes for dense, evenly spaced
+    window positions such as one hop per video frame. Returns the positive
+    frequencies up to max_freq, the window start times in seconds and the
+    (positions x bins) magnitude matrix"""
+    n_window = int(round(window_width * sample_rate))
+    freqs = positive_freqs(n_window, sample_rate)
+    if max_freq is not None:
+        freqs = freqs[freqs <= max_freq]
+    bins = np.arange(1, len(freqs) + 1)  # positive_freqs skips the DC bin
+
+    engine = SlidingDFT(signal, n_window, bins, resync_interval)
+    spectra = np.empty((n_positions, len(bins)))
+    starts = np.empty(n_positions)
+    for position in range(n_positions):
+        spectra[position] = engine.magnitudes()
+        starts[position] = engine.start  # Stops moving at the end of the signal
+        engine.advance(hop)
+    return freqs, starts / sample_rate, spectra
+
+
+def resample_closed_path(points, n_samples):
+    """n_samples complex points evenly spaced by arc length along a closed path"""
+    points = np.asarray(points, dtype=complex)
+    closed = np.append(points, points[0])
+    lengths = np.concatenate([[0], np.cumsum(np.abs(np.diff(closed)))])
+    s = np.linspace(0, lengths[-1], n_samples, endpoint=False)
+    return np.interp(s, lengths, closed.real) + 1j * np.interp(s, lengths, closed.imag)
+
+
+def fourier_series(points, n_terms):
+    """The n_terms largest complex Fourier coefficients of a closed path
+
+    points are complex numbers along the path. Returns integer frequencies
+    and coefficients, largest first, with
+    path(t) ~ sum c_k e^(i 2pi k t) for t in [0, 1)"""
+    n_samples = max(1024, 1 << int(np.ceil(np.log2(n_terms))))
+    samples = resample_closed_path(points, n_samples)
+    coeffs = get_backend().fft(samples) / n_samples
+    freqs = np.rint(np.fft.fftfreq(n_samples, 1/n_samples)).astype(int)
+    order = np.argsort(-np.abs(coeffs), kind="stable")[:n_terms]
+    return freqs[order], coeffs[order]
+
+
+def epicycle_tips(freqs, coeffs, t):
+    """Tip of every vector of the rotating chain at time t in [0, 1)
+
+    One cumulative sum over the rotated coefficients; the last tip is the
+    point of the path. t may also be an array of times"""
+    rotations = np.exp(2j * np.pi * np.multiply.outer(t, freqs))
+    return np.cumsum(coeffs * rotations, axis=-1)
+
+
+def series_path(freqs, coeffs, n_points=1024):
+    """The path drawn by the truncated series at n_points evenly spaced times
+
+    Evaluated with one inverse FFT instead of summing the chain per point"""
+    # A multiple of n_points long enough to hold every frequency without aliasing
+    size = n_points * -(-(2 * int(np.abs(freqs).max()) + 1) // n_points)
+    spectrum = np.zeros(size, dtype=complex)
+    spectrum[np.asarray(freqs) % size] = coeffs
+    return (get_backend().ifft(spectrum) * size)[::size // n_points]
+
+
+def decimate_minmax(x_values, y_values, n_columns):
+    """Reduce a dense sampled curve to at most two points per output column
+
+    Keeps the minimum and maximum of every column in their original order,
+    so peaks survive while the vertex count follows the display width"""
+    x_values = np.asarray(x_values)
+    y_values = np.asarray(y_values)
+    n_samples = len(y_values)
+    if n_samples <= 2 * n_columns:
+        return x_values, y_values
+
+    # Pad to a whole number of equally sized columns with the last sample
+    per_column = -(-n_samples // n_columns)  # Ceiling division
+    padded = np.pad(y_values, (0, n_columns * per_column - n_samples), mode="edge")
+    columns = padded.reshape(n_columns, per_column)
+    column_starts = np.arange(n_columns) * per_column
+
+    keep = np.concatenate([
+        column_starts + columns.argmin(axis=1),
+        column_starts + columns.argmax(axis=1),
+        [0, n_samples - 1],  # Always keep both end points
+    ])
+    keep = np.unique(np.minimum(keep, n_samples - 1))  # Sorted, so order is preserved
+    return x_values[keep], y_values[keep]
+
+
+def sample_signal(components=COMPONENTS, t_range=(0, 2), sample_rate=1000):
+    """Time points and sum-of-sines signal over t_range, shared through the cache"""
+    params = {"components": components, "t_range": t_range, "sample_rate": sample_rate}
+
+    def compute():
+        start, stop = t_range
+        t = np.linspace(start, stop, int((stop - start) * sample_rate))
+        return {"t": t, "signal": get_signal_points(t, components)}
+
+    return CACHE.get_or_compute("signal", params, compute)
+
+
+def adaptive_samples(function, x_min, x_max, n_initial, tolerance, scale=(1, 1), max_rounds=10):
+    """x grid and values of a vectorized function, refined where it bends
+
+    Starts from n_initial even samples. Each round halves, in one call of
+    function, every segment whose midpoint lies more than tolerance from
+    its chord, measured after scaling x and y by scale (e.g. to screen
+    units). Flat stretches keep few points, sharp turns get many"""
+    x = np.linspace(x_min, x_max, n_initial)
+    y = np.broadcast_to(function(x), x.shape).astype(float)
+    active = np.ones(len(x) - 1, dtype=bool)  # Segments that may still need splitting
+    for _ in range(max_rounds):
+        candidates = np.flatnonzero(active)
+        if len(candidates) == 0:
+            break
+        x_mid = (x[candidates] + x[candidates + 1]) / 2
+        y_mid = np.broadcast_to(function(x_mid), x_mid.shape).astype(float)
+
+        # Distance of the true midpoint from the straight segment's midpoint
+        error = np.hypot(
+            scale[0] * (x_mid - (x[candidates] + x[candidates + 1]) / 2),
+            scale[1] * (y_mid - (y[candidates] + y[candidates + 1]) / 2)
+        )
+        split = error > tolerance
+        if not split.any():
+            break
+
+        # Both halves of a split segment are checked again next round
+        split_segments = np.zeros(len(x) - 1, dtype=bool)
+        split_segments[candidates[split]] = True
+        active = np.repeat(split_segments, np.where(split_segments, 2, 1))
+        x = np.insert(x, candidates[split] + 1, x_mid[split])
+        y = np.insert(y, candidates[split] + 1, y_mid[split])
+    return x, y
+
+
+def sample_curve(components=COMPONENTS, x_range=(0, 2), tolerance=0.01, scale=(1, 1)):
+    """Adaptively sampled sum of (frequency, amplitude) sines, shared through the cache
+
+    Starts from 8 samples per cycle of the highest frequency so no
+    oscillation can hide between the initial samples"""
+    params = {"components": components, "x_range": x_range, "tolerance": tolerance, "scale": scale}
+
+    def compute():
+        start, stop = x_range
+        max_freq = max((freq for freq, _ in components), default=0)
+        n_initial = max(16, int(np.ceil(8 * max_freq * (stop - start))) + 1)
+        x, y = adaptive_samples(
+            lambda t: get_signal_points(t, components), start, stop, n_initial, tolerance, scale
+        )
+        return {"x": x, "y": y}
+
+    return CACHE.get_or_compute("curve", params, compute)
+
+
+def fourier_transform_scene_data(duration=2, sample_rate=1000, components=COMPONENTS,
+                                 zoom_bins=None, max_freq=10):
+    """Arrays shown by FourierTransformScene: the signal and its spectrum
+
+    With zoom_bins set, only 0..max_freq is evaluated, at that many bins"""
+    signal_params = {"components": components, "t_range": (0, duration), "sample_rate": sample_rate}
+    sampled = sample_signal(**signal_params)
+    band = None if zoom_bins is None else (0, max_freq, zoom_bins)
+
+    def compute():
+        freqs, magnitudes = get_spectrum(sampled["signal"], sample_rate, band)
+        return {"freqs": freqs, "magnitudes": magnitudes}
+
+    spectrum_params = {**signal_params, "band": band}
+    return {**sampled, **CACHE.get_or_compute("spectrum", spectrum_params, compute)}
+
+
+def fft_scene_data(duration=2, sample_rate=100, components=COMPONENTS,
+                   window_width=0.5, n_positions=20, zoom_bins=None, max_freq=10,
+                   source="stft"):
+    """Arrays shown by the FFT scene: the signal and one spectrum per window position
+
+    With zoom_bins set, only 0..max_freq is evaluated, at that many bins.
+    source="sliding" computes the spectra hop by hop with a SlidingDFT over
+    evenly spaced positions, which suits one window position per frame"""
+    signal_params = {"components": components, "t_range": (0, duration), "sample_rate": sample_rate}
+    sampled = sample_signal(**signal_params)
+    band = None if zoom_bins is None else (0, max_freq, zoom_bins)
+    if source == "sliding" and band is not None:
+        raise ValueError("The sliding DFT tracks FFT bins, it cannot zoom into a band")
+
+    def compute():
+        if source == "sliding":
+            # Sliding DFT hops are whole samples, so dense sweeps over short
+            # signals get fewer positions than requested
+            travel = len(sampled["signal"]) - int(round(window_width * sample_rate))
+            hop = max(1, round(travel / max(n_positions - 1, 1)))
+            freqs, window_positions, spectra = sliding_dft_magnitudes(
+                sampled["signal"], sample_rate, window_width, hop,
+                min(n_positions, travel // hop + 1), max_freq
+            )
+        else:
+            window_positions = np.linspace(0, duration - window_width, n_positions)
+            freqs, spectra = stft_magnitudes(
+                sampled["signal"], sample_rate, window_width, window_positions, band
+            )
+        return {"window_positions": window_positions, "freqs": freqs, "spectra": spectra}
+
+    stft_params = {
+        **signal_params,
+        "window_width": window_width,
+        "n_positions": n_positions,
+        "band": band,
+        "source": source,
+    }
+    return {**sampled, **CACHE.get_or_compute("stft", stft_params, compute)}
+
+
+SCENE_DATA = {
+    "FourierTransformScene": fourier_transform_scene_data,
+    "FFT": fft_scene_data,
+}
+
+
+def _scene_params(scene_name, params):
+    """Full parameter set of a scene, with defaults filled in"""
+    signature = inspect.signature(SCENE_DATA[scene_name])
+    return {**{name: p.default for name, p in signature.parameters.items()}, **params}
+
+
+def save_arrays(path, arrays, params):
+    """Write arrays to an .npz file together with the parameters that produced them"""
+    np.savez(path, _params=np.array(params_key(params)), **arrays)
+
+
+def load_or_compute(scene_name, **params):
+    """Arrays for a scene, from PRECOMPUTED_DIR when they match params
+
+    Falls back to the shared cache when no export exists or it was made
+    with different parameters"""
+    params = _scene_params(scene_name, params)
+    path = os.path.join(PRECOMPUTED_DIR, f"{scene_name}.npz")
+    if os.path.exists(path):
+        with np.load(path) as stored:
+            if str(stored["_params"]) == params_key(params):
+                return {name: stored[name] for name in stored.files if name != "_params"}
+    return SCENE_DATA[scene_name](**params)
+
+
+def _parse_components(text):
+    """Parse "2:1,5:0.5,8:0.3" into [(2.0, 1.0), (5.0, 0.5), (8.0, 0.3)]"""
+    return [tuple(float(v) for v in part.split(":")) for part in text.split(",")]
+
+
+def _load_input_signal(args):
+    """Signal for the CLI: a WAV recording or the synthesized sum of sines"""
+    if args.wav:
+        from audio import read_wav, to_mono_float
+        samples, sample_rate = read_wav(args.wav)
+        return to_mono_float(samples), sample_rate
+    t = np.linspace(0, args.duration, int(args.duration * args.sample_rate))
+    return get_signal_points(t, args.components), args.sample_rate
+
+
+def _save_cli_output(path, arrays):
+    if path.endswith(".npy"):
+        # A single .npy holds only the main matrix, frequencies go next to it
+        main = arrays["spectra"] if "spectra" in arrays else arrays["magnitudes"]
+        np.save(path, main)
+        np.save(path[:-len(".npy")] + "_freqs.npy", arrays["freqs"])
+    else:
+        np.savez(path, **arrays)
+    print(f"Wrote {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute and export spectra without rendering")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("spectrum", "stft"):
+        command = commands.add_parser(name)
+        command.add_argument("-o", "--output", required=True, help=".npz or .npy file")
+        command.add_argument("--wav", help="Analyze a WAV recording instead of the test signal")
+        command.add_argument("--duration", type=float, default=2)
+        command.add_argument("--sample-rate", type=float, default=1000)
+        command.add_argument("--components", type=_parse_components, default=COMPONENTS,
+                             help='Sine components as "freq:amp,freq:amp,..."')
+        command.add_argument("--band", nargs=3, type=float, metavar=("F_START", "F_STOP", "N_BINS"),
+                             help="Only evaluate this band, at N_BINS evenly spaced frequencies")
+        if name == "stft":
+            command.add_argument("--window-width", type=float, default=0.5, help="Seconds")
+            command.add_argument("--hop", type=float, help="Seconds between windows (default half a window)")
+
+    scenes = commands.add_parser("scenes", help="Export the arrays used by the scenes")
+    scenes.add_argument("--output-dir", default=PRECOMPUTED_DIR)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "scenes":
+        os.makedirs(args.output_dir, exist_ok=True)
+        for scene_name, compute in SCENE_DATA.items():
+            path = os.path.join(args.output_dir, f"{scene_name}.npz")
+            save_arrays(path, compute(), _scene_params(scene_name, {}))
+            print(f"Wrote {path}")
+        return
+
+    signal, sample_rate = _load_input_signal(args)
+    band = None if args.band is None else (args.band[0], args.band[1], int(args.band[2]))
+    if args.command == "spectrum":
+        freqs, magnitudes = get_spectrum(signal, sample_rate, band)
+        _save_cli_output(args.output, {"freqs": freqs, "magnitudes": magnitudes})
+    else:
+        hop = args.hop or args.window_width / 2
+        duration = len(signal) / sample_rate
+        window_positions = np.arange(0, duration - args.window_width + 1e-9, hop)
+        freqs, spectra = stft_magnitudes(signal, sample_rate, args.window_width, window_positions, band)
+        _save_cli_output(args.output, {
+            "window_positions": window_positions,
+            "freqs": freqs,
+            "spectra": spectra,
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Selectable FFT implementations that reuse plans and buffers
+
+    FOURIER_FFT_BACKEND=scipy FOURIER_FFT_WORKERS=8 python render_all.py
+
+"numpy" is always available. "scipy" spreads batched transforms over
+worker threads. "pyfftw" also runs on several threads, and additionally
+plans every transform size once and keeps that plan's output buffer.
+"auto", the default, picks the first of pyfftw, scipy and numpy that is
+installed. All transforms run along the last axis. Threaded backends
+use every core by default, except in the render_all.py and sweep.py
+workers: those already run one process per core, so their FFTs stay on
+one thread unless FOURIER_FFT_WORKERS says otherwise.
+
+Spectrograms run thousands of transforms of the same size, so backends
+also hand out reusable input buffers (see buffer) to gather windows into
+instead of allocating a new array for every batch.
+"""
+from collections import OrderedDict
+import os
+import threading
+
+import numpy as np
+
+
+# Buffers and plans kept per thread; the least recently used go first, so
+# runs over many window sizes do not keep every size's arrays alive
+MAX_BUFFERS = 4
+MAX_PLANS = 8
+
+
+def _recent(local, name, key, create, size):
+    """Entry key of the per-thread LRU cache name, created if missing"""
+    cache = local.__dict__.setdefault(name, OrderedDict())
+    if key in cache:
+        cache.move_to_end(key)
+    else:
+        cache[key] = create()
+        if len(cache) > size:
+            cache.popitem(last=False)
+    return cache[key]
+
+
+class NumpyFFT:
+    """numpy.fft, single threaded"""
+    name = "numpy"
+
+    def __init__(self, workers=None):
+        self.workers = 1
+        self._local = threading.local()  # Buffers and plans are per thread
+
+    def buffer(self, shape, dtype=np.float64):
+        """Reusable input array for transforms of this shape
+
+        Filling it in place (e.g. np.take(..., out=buffer)) avoids a new
+        allocation per batch. It is shared by all callers on the thread,
+        so its contents only last until the next same-shaped request"""
+        key = (tuple(shape), np.dtype(dtype))
+        return _recent(self._local, "buffers", key, lambda: self._allocate(shape, dtype), MAX_BUFFERS)
+
+    def _allocate(self, shape, dtype):
+        return np.empty(shape, dtype)
+
+    def rfft(self, x, n=None):
+        return np.fft.rfft(x, n, axis=-1)
+
+    def fft(self, x, n=None):
+        return np.fft.fft(x, n, axis=-1)
+
+    def ifft(self, x, n=None):
+        return np.fft.ifft(x, n, axis=-1)
+
+
+class ScipyFFT(NumpyFFT):
+    """scipy.fft, with batched transforms split over worker threads"""
+    name = "scipy"
+
+    def __init__(self, workers=None):
+        super().__init__()
+        import scipy.fft
+
+        self.module = scipy.fft
+        self.workers = workers or os.cpu_count()
+
+    def rfft(self, x, n=None):
+        return self.module.rfft(x, n, axis=-1, workers=self.workers)
+
+    def fft(self, x, n=None):
+        return self.module.fft(x, n, axis=-1, workers=self.workers)
+
+    def ifft(self, x, n=None):
+        return self.module.ifft(x, n, axis=-1, workers=self.workers)
+
+
+class PyFFTW(NumpyFFT):
+    """FFTW through pyFFTW, planned once per transform shape
+
+    Results are the plan's output array, which the next transform of the
+    same shape overwrites: take what is needed (e.g. np.abs) right away"""
+    name = "pyfftw"
+    planner_effort = "FFTW_MEASURE"
+
+    def __init__(self, workers=None):
+        super().__init__()
+        import pyfftw
+
+        self.pyfftw = pyfftw
+        self.workers = workers or os.cpu_count()
+
+    def _allocate(self, shape, dtype):
+        return self.pyfftw.empty_aligned(shape, dtype)
+
+    def _plan(self, kind, x, n):
+        def plan():
+            # Plan on a scratch array, as measuring overwrites the input
+            builder = getattr(self.pyfftw.builders, kind)
+            return builder(
+                self._allocate(x.shape, x.dtype), n, axis=-1,
+                threads=self.workers, planner_effort=self.planner_effort
+            )
+
+        return _recent(self._local, "plans", (kind, x.shape, x.dtype, n), plan, MAX_PLANS)
+
+    def _execute(self, kind, x, n):
+        x = np.asarray(x)
+        if kind == "rfft":
+            x = x.astype(np.float64, copy=False)
+        elif not np.iscomplexobj(x):
+            x = x.astype(np.complex128)
+        # Aligned inputs such as buffer() arrays are transformed in place, others copied
+        return self._plan(kind, x, n)(x)
+
+    def rfft(self, x, n=None):
+        return self._execute("rfft", x, n)
+
+    def fft(self, x, n=None):
+        return self._execute("fft", x, n)
+
+    def ifft(self, x, n=None):
+        return self._execute("ifft", x, n)
+
+
+BACKENDS = {"numpy": NumpyFFT, "scipy": ScipyFFT, "pyfftw": PyFFTW}
+
+
+def make_backend(name="auto", workers=None):
+    """FFT backend by name; "auto" falls back to the best one installed"""
+    if name == "auto":
+        for candidate in ("pyfftw", "scipy"):
+            try:
+                return BACKENDS[candidate](workers)
+            except ImportError:
+                continue
+        return NumpyFFT()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown FFT backend {name!r}, expected auto or one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](workers)
+
+
+_backend = None
+
+
+def get_backend():
+    """The backend used by dsp, chosen by FOURIER_FFT_BACKEND and FOURIER_FFT_WORKERS"""
+    global _backend
+    if _backend is None:
+        workers = os.environ.get("FOURIER_FFT_WORKERS")
+        _backend = make_backend(
+            os.environ.get("FOURIER_FFT_BACKEND", "auto"), int(workers) if workers else None
+        )
+    return _backend
+
+
+def set_backend(name, workers=None):
+    """Switch the backend used by dsp, returning it"""
+    global _backend
+    _backend = make_backend(name, workers)
+    return _backend
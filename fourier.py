@@ -1,36 +1,64 @@
 from manim import *
 import numpy as np
- 
+import os
 
-class FFT(Scene):
-    def construct(self):
-        # Helper functions for signal processing
-        def get_signal_points(t):
-            """Generate a complex signal composed of three sine waves"""
-            return (np.sin(2 * np.pi * 2 * t) +      # Base frequency: 2 Hz
-                   0.5 * np.sin(2 * np.pi * 5 * t) + # Higher frequency: 5 Hz, half amplitude
-                   0.3 * np.sin(2 * np.pi * 8 * t))  # Highest frequency: 8 Hz, 0.3 amplitude
-
-        def get_component_points(t, freq, amplitude=1):
-            """Generate a single sine wave with given frequency and amplitude"""
-            return amplitude * np.sin(2 * np.pi * freq * t)
-
-        def get_fft(signal, sample_rate):
-            """Compute the Fast Fourier Transform of the signal
-            Returns positive frequencies and their magnitudes"""
-            fft_vals = np.fft.fft(signal)  # Compute FFT
-            fft_freqs = np.fft.fftfreq(len(signal), 1/sample_rate)  # Get frequency bins
-            pos_mask = fft_freqs > 0  # Only keep positive frequencies
-            return fft_freqs[pos_mask], np.abs(fft_vals)[pos_mask]
+from background import CachedBackgroundScene
+from draft import DraftScene, draft_params, scaled
+from dsp import get_component_points, load_or_compute
+from layers import Layers, enabled_layers
+from plotting import SpectrogramImage, StemPlot, plot_function, plot_sampled_signal
+from spectrogram import pyramid_for
+from streaming import SpectrumStream
+
+
+class FFT(DraftScene, CachedBackgroundScene, Scene):
+    # Axes, numbers and the signal are rasterized once for the whole sweep (see background.py)
 
+    # Scene parameters; sweep.py renders variants with any of them overridden
+    params = {
+        "duration": 2,  # Seconds of signal
+        "sample_rate": 100,  # Reduced from 1000 to 100 Hz - still sufficient for visualization
+        "components": [(2, 1), (5, 0.5), (8, 0.3)],  # (frequency in Hz, amplitude)
+        "window_width": 0.5,  # Window width in seconds
+        "n_positions": 20,  # Window positions; None for one per video frame
+        "zoom_bins": None,  # Set e.g. to 200 to evaluate only 0-max_freq Hz at that many bins
+        "max_freq": 10,  # Top of the frequency axis in Hz
+        "sweep_run_time": 4,  # Seconds for the window to slide across the signal
+        "source": "stft",  # "sliding" updates the spectrum hop by hop with a sliding DFT
+        "layers": [],  # Overlays to show, e.g. ["components", "annotations"] or ["all"]
+        "draft": None,  # "auto", "on" or "off" (see draft.py); None follows FOURIER_DRAFT
+    }
+
+    def construct(self):
         # Setup sampling parameters
-        sample_rate = 100  # Reduced from 1000 to 100 Hz - still sufficient for visualization
-        t = np.linspace(0, 2, sample_rate * 2)  # 2 seconds of time points
-        components = [(2, 1), (5, 0.5), (8, 0.3)]  # Keeping the same components
+        params = self.params
+        duration = params["duration"]
+        sample_rate = params["sample_rate"]
+        components = params["components"]
+        window_width = params["window_width"]
+        max_freq = params["max_freq"]
+        sweep_run_time = params["sweep_run_time"]
+
+        # Signal and the spectrum of every window position (precomputed when available),
+        # with fewer positions and bins in draft mode
+        data_params = draft_params("FFT", {
+            "duration": duration,
+            "sample_rate": sample_rate,
+            "components": components,
+            "window_width": window_width,
+            "n_positions": params["n_positions"],
+            "zoom_bins": params["zoom_bins"],
+            "max_freq": max_freq,
+            "source": params["source"],
+        })
+        if data_params["n_positions"] is None:
+            data_params["n_positions"] = int(sweep_run_time * config.frame_rate) + 1
+        data = load_or_compute("FFT", **data_params)
+        t = data["t"]  # Time points of the whole signal
 
         # Adjust axes for better visibility
         time_axes = Axes(
-            x_range=[0, 2, 0.5],
+            x_range=[0, duration, duration / 4],
             y_range=[-2, 2, 1],
             x_length=8,  # Increased from 6 to 8 for better visibility
             y_length=4,  # Increased from 3 to 4
@@ -38,50 +66,17 @@ class FFT(Scene):
         ).to_edge(UP)
 
         freq_axes = Axes(
-            x_range=[0, 10, 1],
+            x_range=[0, max_freq, max(1, max_freq // 10)],
             y_range=[0, 1.2, 0.2],
             x_length=8,  # Increased from 6 to 8
             y_length=4,  # Increased from 3 to 4
             axis_config={"color": BLUE, "include_numbers": True},  # Added numbers
         ).to_edge(DOWN)
 
-        # Create small axes for individual frequency components
-        component_axes_group = VGroup()
-        component_plots = VGroup()
-        component_labels = VGroup()
-
-        # Create a small display for each frequency component
-        for i, (freq, amp) in enumerate(components):
-            # Create small axes for this component
-            ax = Axes(
-                x_range=[0, 1, 0.5],
-                y_range=[-1, 1, 0.5],
-                x_length=2,
-                y_length=1,
-                axis_config={"color": GREY_B, "stroke_width": 1}
-            ).to_edge(RIGHT, buff=0.5)
-            ax.shift(UP * (i - 1) * 1.5)  # Stack vertically
-            
-            # Plot the individual sine wave
-            component_signal = get_component_points(t[:sample_rate], freq, amp)
-            plot = ax.plot_line_graph(
-                x_values=t[:sample_rate],
-                y_values=component_signal,
-                line_color=YELLOW,
-                stroke_width=2
-            )
-            
-            # Add frequency and amplitude label
-            label = Text(f"{freq}Hz × {amp}", font_size=16).next_to(ax, LEFT)
-            
-            # Group elements for animation
-            component_axes_group.add(ax)
-            component_plots.add(plot)
-            component_labels.add(label)
-
         # Create the main signal visualization
-        signal = get_signal_points(t)
-        time_plot = time_axes.plot_line_graph(
+        signal = data["signal"]
+        time_plot = plot_sampled_signal(
+            time_axes,
             x_values=t,
             y_values=signal,
             line_color=YELLOW,
@@ -89,7 +84,6 @@ class FFT(Scene):
         )
 
         # Create sliding window for FFT analysis
-        window_width = 0.5  # Window width in seconds
         window = Rectangle(
             width=window_width * time_axes.get_x_unit_size(),
             height=time_axes.height,
@@ -99,30 +93,65 @@ class FFT(Scene):
             fill_opacity=0.2
         ).align_to(time_axes, LEFT)
 
+        # Window positions for animation and their spectra from one batched FFT
+        window_positions = data["window_positions"]
+        freqs, spectra = data["freqs"], data["spectra"]
+
         # Initialize frequency spectrum visualization
-        freq_dots = VGroup()
-        freq_stems = VGroup()
-        freqs, magnitudes = get_fft(signal[:int(window_width * sample_rate)], sample_rate)
-        
-        # Create dots and stems for frequency spectrum
-        for freq, mag in zip(freqs[:50], magnitudes[:50]):  # Only show first 50 frequencies
-            dot = Dot(freq_axes.c2p(freq, mag), color=RED)
-            stem = Line(
-                freq_axes.c2p(freq, 0),
-                freq_axes.c2p(freq, mag),
-                color=RED,
-                stroke_width=2
-            )
-            freq_dots.add(dot)
-            freq_stems.add(stem)
+        magnitudes = spectra[0]
+        shown = freqs <= max_freq  # Only show the frequencies covered by the axes
+        freq_spectrum = StemPlot(freq_axes, freqs[shown], magnitudes[shown], color=RED)
+
+        # Optional overlays, only built when their layer is enabled (see layers.py)
+        layers = Layers(enabled_layers(params["layers"]))
+
+        # Small axes with each frequency component on its own, stacked vertically
+        @layers.register("components")
+        def create_components():
+            component_axes_group = VGroup()
+            component_plots = VGroup()
+            component_labels = VGroup()
+
+            # Create a small display for each frequency component
+            for i, (freq, amp) in enumerate(components):
+                # Create small axes for this component
+                ax = Axes(
+                    x_range=[0, 1, 0.5],
+                    y_range=[-1, 1, 0.5],
+                    x_length=2,
+                    y_length=1,
+                    axis_config={"color": GREY_B, "stroke_width": 1}
+                ).to_edge(RIGHT, buff=0.5)
+                ax.shift(UP * (i - 1) * 1.5)  # Stack vertically
+
+                # Plot the individual sine wave
+                component_signal = get_component_points(t[:int(sample_rate)], freq, amp)
+                plot = plot_sampled_signal(
+                    ax,
+                    x_values=t[:int(sample_rate)],
+                    y_values=component_signal,
+                    line_color=YELLOW,
+                    stroke_width=2
+                )
+
+                # Add frequency and amplitude label
+                label = Text(f"{freq}Hz × {amp}", font_size=16).next_to(ax, LEFT)
+
+                # Group elements for animation
+                component_axes_group.add(ax)
+                component_plots.add(plot)
+                component_labels.add(label)
+            return VGroup(component_axes_group, component_plots, component_labels)
 
-        # Add phase visualization circle
-        phase_circle = Circle(radius=0.5, color=BLUE).to_edge(RIGHT, buff=0.5)
-        phase_dot = Dot(color=YELLOW).move_to(phase_circle.point_from_proportion(0))
-        phase_line = Line(phase_circle.get_center(), phase_dot.get_center(), color=YELLOW)
-        phase_group = VGroup(phase_circle, phase_dot, phase_line)
+        # Phase visualization circle
+        @layers.register("phase")
+        def create_phase():
+            phase_circle = Circle(radius=0.5, color=BLUE).to_edge(RIGHT, buff=0.5)
+            phase_dot = Dot(color=YELLOW).move_to(phase_circle.point_from_proportion(0))
+            phase_line = Line(phase_circle.get_center(), phase_dot.get_center(), color=YELLOW)
+            return VGroup(phase_circle, phase_dot, phase_line)
 
-        # New interactive element: Frequency Control Sliders
+        # Frequency control sliders
         class FrequencySlider(VGroup):
             def __init__(self, freq, amplitude, **kwargs):
                 super().__init__(**kwargs)
@@ -136,35 +165,40 @@ class FFT(Scene):
                 ).next_to(self.slider, RIGHT)
                 self.add(self.slider, self.knob, self.label, self.value)
 
-        # Create interactive sliders
-        sliders = VGroup(*[
-            FrequencySlider(freq, amp).shift(UP * i)
-            for i, (freq, amp) in enumerate(components)
-        ]).to_edge(LEFT, buff=1)
-
-        # New educational annotations
-        annotations = VGroup(
-            # Time Domain Annotations
-            Arrow(start=LEFT, end=RIGHT).scale(0.5),
-            Text("Time →", font_size=16),
-            
-            # Frequency Domain Annotations
-            Arrow(start=LEFT, end=RIGHT).scale(0.5),
-            Text("Frequency →", font_size=16),
-            
-            # Window Explanation
-            Text("Sliding Window", font_size=16),
-            Text("(Analyzes signal segment)", font_size=14),
-            
-            # Phase Information
-            Text("Phase Circle", font_size=16),
-            Text("Shows signal rotation", font_size=14)
-        )
+        @layers.register("sliders")
+        def create_sliders():
+            return VGroup(*[
+                FrequencySlider(freq, amp).shift(UP * i)
+                for i, (freq, amp) in enumerate(components)
+            ]).to_edge(LEFT, buff=1)
+
+        # Educational annotations
+        @layers.register("annotations")
+        def create_annotations():
+            return VGroup(
+                # Time Domain Annotations
+                Arrow(start=LEFT, end=RIGHT).scale(0.5),
+                Text("Time →", font_size=16),
+
+                # Frequency Domain Annotations
+                Arrow(start=LEFT, end=RIGHT).scale(0.5),
+                Text("Frequency →", font_size=16),
+
+                # Window Explanation
+                Text("Sliding Window", font_size=16),
+                Text("(Analyzes signal segment)", font_size=14),
+
+                # Phase Information
+                Text("Phase Circle", font_size=16),
+                Text("Shows signal rotation", font_size=14)
+            ).arrange(DOWN, buff=0.5).to_edge(RIGHT)
 
-        # New interactive element: Time-Frequency Correlation Lines
+        # Time-frequency correlation lines
+        @layers.register("correlation")
         def create_correlation_lines():
             lines = VGroup()
-            for freq, mag in zip(freqs[:50], magnitudes[:50]):
+            n_bins = scaled(50, 10)
+            for freq, mag in zip(freqs[:n_bins], magnitudes[:n_bins]):
                 if mag > 0.1:  # Only show significant frequencies
                     line = DashedLine(
                         start=time_axes.c2p(0, mag),
@@ -175,30 +209,41 @@ class FFT(Scene):
                     lines.add(line)
             return lines
 
-        # New interactive element: Real-time Frequency Indicator
-        freq_indicator = Triangle(
-            fill_color=YELLOW,
-            fill_opacity=1
-        ).scale(0.1).rotate(-PI/2)
-        
-        # New educational element: Frequency Components Breakdown
+        # Frequency indicator, follows the spectral peak during the sweep
+        @layers.register("indicator")
+        def create_freq_indicator():
+            return Triangle(
+                fill_color=YELLOW,
+                fill_opacity=1
+            ).scale(0.1).rotate(-PI/2)
+
+        # Frequency components breakdown
+        @layers.register("breakdown")
         def create_component_breakdown():
             breakdown = VGroup()
             for freq, amp in components:
-                wave = time_axes.plot(
-                    lambda x: amp * np.sin(2 * PI * freq * x),
+                wave = plot_function(
+                    time_axes,
+                    components=[(freq, amp)],
                     color=BLUE_C
                 ).set_opacity(0.5)  # Set opacity after creating the plot
                 breakdown.add(wave)
             return breakdown
 
-        # Add new mathematical visualization
+        # Mathematical definition
+        @layers.register("equation")
         def create_fourier_equation():
             return MathTex(
                 "F(\\omega) = \\int_{-\\infty}^{\\infty} f(t)e^{-i\\omega t}dt",
                 font_size=24
             ).to_edge(UP)
 
+        def place_indicator(magnitudes):
+            peak = np.argmax(magnitudes)
+            layers.get("indicator").next_to(
+                freq_axes.c2p(freqs[shown][peak], magnitudes[peak]), UP, buff=0.1
+            )
+
         # Interactive tooltip system
         class Tooltip(VGroup):
             def __init__(self, text, target, **kwargs):
@@ -209,27 +254,23 @@ class FFT(Scene):
                 self.add(self.bubble, self.text)
                 self.next_to(target, UP)
 
-        # Add before the animation sequence
-        # Define window positions for animation
-        window_positions = np.linspace(0, 2 - window_width, 20)  # Reduced from 50 to 20 positions
-
-        # Define spectrum update function
-        def update_spectrum(wx):
-            start_idx = int(wx * sample_rate)
-            end_idx = int((wx + window_width) * sample_rate)
-            window_signal = signal[start_idx:end_idx]
-            freqs, magnitudes = get_fft(window_signal, sample_rate)
-            
-            # Update frequency spectrum visualization
-            for i, (freq, mag) in enumerate(zip(freqs[:50], magnitudes[:50])):
-                freq_dots[i].move_to(freq_axes.c2p(freq, mag))
-                freq_stems[i].put_start_and_end_on(
-                    freq_axes.c2p(freq, 0),
-                    freq_axes.c2p(freq, mag)
-                )
+        # A single tracker over (fractional) window position drives the whole sweep
+        position_tracker = ValueTracker(0)
+        position_indices = np.arange(len(window_positions))
+
+        def update_sweep(mob):
+            position = position_tracker.get_value()
+            idx = min(int(position), len(window_positions) - 2)
+            alpha = position - idx
 
-        # Position the labels and annotations properly
-        annotations.arrange(DOWN, buff=0.5).to_edge(RIGHT)
+            # Interpolate between the two neighbouring precomputed spectra
+            current = (1 - alpha) * spectra[idx, shown] + alpha * spectra[idx + 1, shown]
+            freq_spectrum.set_magnitudes(current)
+            if layers.is_enabled("indicator"):
+                place_indicator(current)
+
+            wx = np.interp(position, position_indices, window_positions)
+            window.move_to(time_axes.c2p(wx + window_width/2, 0))
 
         # Animation sequence with new elements
         self.play(
@@ -241,25 +282,157 @@ class FFT(Scene):
         self.play(
             Create(time_plot),
             Create(window),
-            Create(freq_dots),
-            Create(freq_stems),
+            Create(freq_spectrum),
             run_time=1
         )
 
-        # Simplified window sliding animation
-        for wx in window_positions:
-            self.play(
-                window.animate.move_to(
-                    time_axes.c2p(wx + window_width/2, 0),
-                    aligned_edge=ORIGIN
-                ),
-                *[
-                    UpdateFromFunc(freq_dots[i], lambda m, i=i, f=freq, mag=mag: m.move_to(freq_axes.c2p(f, mag)))
-                    for i, (freq, mag) in enumerate(zip(freqs[:50], magnitudes[:50]))
-                ],
-                run_time=0.2,  # Faster animation
-            )
-            update_spectrum(wx)
+        # Build and fade in the enabled overlays only
+        overlays = layers.shown()
+        if layers.is_enabled("indicator"):
+            place_indicator(magnitudes[shown])
+        if overlays:
+            self.play(*[FadeIn(overlay) for overlay in overlays], run_time=0.5)
+
+            # Keep the moving window and spectrum above the overlays that stay put, so those
+            # join the cached static background; the indicator moves, so it stays on top
+            self.bring_to_front(window, freq_spectrum)
+            if layers.is_enabled("indicator"):
+                self.bring_to_front(layers.get("indicator"))
+
+        # Move the window onto the signal before the sweep starts
+        self.play(
+            window.animate.move_to(time_axes.c2p(window_positions[0] + window_width/2, 0)),
+            run_time=0.2
+        )
+
+        # Continuous window sliding animation driven by one updater
+        window.add_updater(update_sweep)
+        self.play(
+            position_tracker.animate.set_value(len(window_positions) - 1),
+            run_time=sweep_run_time,
+            rate_func=linear
+        )
+        window.remove_updater(update_sweep)
 
         self.wait(1)  # Reduced wait time
+        if layers.any_enabled():
+            logger.info(layers.report(f"Overlay layers of {type(self).__name__}"))
+
+
+class StreamingSpectrum(Scene):
+    """Live spectrum of raw PCM streamed in from stdin, a FIFO or a Unix socket
+
+        FOURIER_STREAM=- FOURIER_STREAM_RATE=44100 manim fourier.py StreamingSpectrum < capture.raw
+    """
+    def construct(self):
+        # Stream settings (raw mono int16 PCM unless told otherwise)
+        source = os.environ.get("FOURIER_STREAM", "-")
+        sample_rate = int(os.environ.get("FOURIER_STREAM_RATE", 44100))
+        max_freq = float(os.environ.get("FOURIER_STREAM_MAX_FREQ", 5000))
+        max_seconds = float(os.environ.get("FOURIER_STREAM_SECONDS", 60))  # Longest video to render
+        window_width = 0.05  # Window width in seconds
+
+        # One hop of samples per video frame keeps the video in step with the audio
+        hop_size = max(1, round(sample_rate / config.frame_rate))
+        stream = SpectrumStream(source, sample_rate, window_width, hop_size)
+        window_t = np.arange(stream.window_size) / sample_rate
+
+        time_axes = Axes(
+            x_range=[0, window_width, window_width / 5],
+            y_range=[-1, 1, 0.5],
+            x_length=8,
+            y_length=3,
+            axis_config={"color": BLUE},
+        ).to_edge(UP)
+
+        freq_axes = Axes(
+            x_range=[0, max_freq, max_freq / 5],
+            y_range=[0, 1, 0.2],
+            x_length=8,
+            y_length=3.5,
+            axis_config={"color": BLUE, "include_numbers": True},
+        ).to_edge(DOWN)
+
+        shown = stream.freqs <= max_freq
+        freq_spectrum = StemPlot(freq_axes, stream.freqs[shown], color=RED, marker_size=4)
+        time_plot = plot_sampled_signal(time_axes, window_t, np.zeros_like(window_t))
+
+        def update_stream(mob):
+            frame = stream.next_frame()
+            if frame is None:  # Stream ended: keep the last frame
+                return
+            samples, magnitudes = frame
+            time_plot.become(plot_sampled_signal(time_axes, window_t, samples))
+            freq_spectrum.set_magnitudes(magnitudes[shown])
+
+        self.add(time_axes, freq_axes, time_plot, freq_spectrum)
+        time_plot.add_updater(update_stream)
+        self.wait(max_seconds, stop_condition=lambda: stream.finished)
+        time_plot.remove_updater(update_stream)
 
+
+class SpectrogramScene(Scene):
+    """Zoom and pan over the spectrogram of a long recording
+
+    Every frame reads only the tiles it shows from the memory-mapped
+    spectrogram pyramid, so hours of audio render in constant memory"""
+    def construct(self):
+        # Any long recording works; without one a ten-minute synthetic sweep is shown
+        recording = os.environ.get("FOURIER_SPECTROGRAM_WAV", "Fayrouz.wav")
+        pyramid = pyramid_for(recording if os.path.exists(recording) else None)
+        duration = pyramid.duration
+        zoomed_span = min(5, duration / 4)  # Seconds shown when zoomed in
+
+        title = Text("Spectrogram", font_size=36).to_edge(UP)
+        image = SpectrogramImage(pyramid, pixel_width=640, pixel_height=320)
+        image.stretch_to_fit_width(10).stretch_to_fit_height(5).next_to(title, DOWN, buff=0.3)
+        border = SurroundingRectangle(image, buff=0, color=BLUE, stroke_width=2)
+
+        # The visible region: centre time, log2 of the time span and top frequency.
+        # Zooming on a log scale keeps the apparent zoom speed constant
+        center = ValueTracker(duration / 2)
+        log_span = ValueTracker(np.log2(duration))
+        f_max = ValueTracker(min(pyramid.max_freq, 5000))
+
+        def t_start():
+            return center.get_value() - 2 ** log_span.get_value() / 2
+
+        def t_end():
+            return center.get_value() + 2 ** log_span.get_value() / 2
+
+        def update_image(mob):
+            mob.show(t_start(), t_end(), 0, f_max.get_value())
+
+        # Region labels at the corners of the image
+        start_label = DecimalNumber(0, num_decimal_places=1, unit="s", font_size=24)
+        end_label = DecimalNumber(0, num_decimal_places=1, unit="s", font_size=24)
+        freq_label = DecimalNumber(0, num_decimal_places=0, unit="Hz", font_size=24)
+        start_label.add_updater(lambda m: m.set_value(t_start()).next_to(image, DOWN, aligned_edge=LEFT))
+        end_label.add_updater(lambda m: m.set_value(t_end()).next_to(image, DOWN, aligned_edge=RIGHT))
+        freq_label.add_updater(lambda m: m.set_value(f_max.get_value()).next_to(image, LEFT).align_to(image, UP))
+        labels = VGroup(start_label, end_label, freq_label)
+
+        update_image(image)
+        image.add_updater(update_image)
+        self.play(Write(title), FadeIn(image), Create(border), FadeIn(labels), run_time=1)
+
+        # Zoom into a few seconds in the middle of the recording
+        self.play(log_span.animate.set_value(np.log2(zoomed_span)), run_time=4)
+
+        # Pan forward, then zoom into the low frequencies
+        self.play(
+            center.animate.set_value(min(duration - zoomed_span / 2, duration / 2 + 4 * zoomed_span)),
+            run_time=3,
+            rate_func=linear
+        )
+        self.play(f_max.animate.set_value(f_max.get_value() / 4), run_time=2)
+
+        # Back out to the whole recording
+        self.play(
+            center.animate.set_value(duration / 2),
+            log_span.animate.set_value(np.log2(duration)),
+            f_max.animate.set_value(min(pyramid.max_freq, 5000)),
+            run_time=4
+        )
+        image.remove_updater(update_image)
+        self.wait(1)
@@ -0,0 +1,71 @@
+"""Optional scene overlays that are only built when shown
+
+    FOURIER_LAYERS=components,annotations manim fourier.py FFT
+    FOURIER_LAYERS=all manim fourier.py FFT
+
+A scene registers each overlay (labels, annotations, helper plots) as a
+named layer together with the function that builds it. Registering costs
+nothing: a layer is built the first time it is asked for, and only if it
+is enabled, so overlays that are switched off never pay for Text layout,
+LaTeX or SVG parsing. The time spent building each layer is recorded for
+a report the scene can log.
+"""
+import os
+import time
+
+
+def enabled_layers(default=()):
+    """Layer names to enable: FOURIER_LAYERS (comma separated, "all" or "none") or default"""
+    value = os.environ.get("FOURIER_LAYERS")
+    if value is None:
+        return set(default)
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    return set() if names == {"none"} else names
+
+
+class Layers:
+    """Named overlays of a scene, each built on first use if enabled"""
+    def __init__(self, enabled=()):
+        self.enabled = set(enabled)
+        self.builders = {}
+        self.built = {}
+        self.timings = {}  # Construction seconds of every built layer
+
+    def register(self, name):
+        """Decorator registering a function that builds (and returns) the layer's mobject"""
+        def decorator(build):
+            self.builders[name] = build
+            return build
+        return decorator
+
+    def is_enabled(self, name):
+        return name in self.builders and ("all" in self.enabled or name in self.enabled)
+
+    def get(self, name):
+        """The layer's mobject, built now if needed; None when it is disabled"""
+        if not self.is_enabled(name):
+            return None
+        if name not in self.built:
+            start = time.perf_counter()
+            self.built[name] = self.builders[name]()
+            self.timings[name] = time.perf_counter() - start
+        return self.built[name]
+
+    def any_enabled(self):
+        return any(self.is_enabled(name) for name in self.builders)
+
+    def shown(self):
+        """Mobjects of all enabled layers, in registration order"""
+        unknown = sorted(self.enabled - set(self.builders) - {"all"})
+        if unknown:
+            raise ValueError(f"Unknown layers {', '.join(unknown)} (known: {', '.join(self.builders)})")
+        return [self.get(name) for name in self.builders if self.is_enabled(name)]
+
+    def report(self, title="Layers"):
+        """Table of the construction time of every layer, or that it was skipped"""
+        lines = [f"{title} (seconds to build)"]
+        for name in self.builders:
+            timing = f"{self.timings[name]:8.3f}" if name in self.timings else "     off"
+            lines.append(f"  {name:<20}{timing}")
+        lines.append(f"  {'Total':<20}{sum(self.timings.values()):8.3f}")
+        return "\n".join(lines)
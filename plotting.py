@@ -0,0 +1,207 @@
+from manim import (
+    BLACK,
+    BLUE,
+    ORIGIN,
+    PURPLE,
+    RED,
+    WHITE,
+    YELLOW,
+    Circle,
+    ImageMobject,
+    VGroup,
+    VMobject,
+    color_gradient,
+    color_to_int_rgba,
+    config,
+)
+import numpy as np
+
+from draft import current_detail
+from dsp import adaptive_samples, decimate_minmax, epicycle_tips, sample_curve, series_path
+
+
+# Output width at which StemPlot markers are marker_size pixels wide
+MARKER_REFERENCE_WIDTH = 1920
+
+
+class StemPlot(VGroup):
+    """Stem plot of a spectrum drawn with two mobjects instead of one per bin
+
+    All stems live in a single multi-segment VMobject and all round markers
+    in another, both rebuilt from the same array of stem tops, so Create
+    and the other VMobject animations work on it. marker_size is the
+    marker diameter in pixels of a 1080p render; markers are vector
+    shapes, so they keep their size on screen at every quality"""
+    def __init__(self, axes, freqs, magnitudes=None, color=RED,
+                 stroke_width=2, marker_size=12, **kwargs):
+        super().__init__(**kwargs)
+        self.freqs = np.asarray(freqs, dtype=float)
+
+        # Axes are linear, so bin positions are one affine transform away
+        origin = axes.c2p(0, 0)
+        self.x_unit = axes.c2p(1, 0) - origin
+        self.y_unit = axes.c2p(0, 1) - origin
+        self.bases = origin + np.outer(self.freqs, self.x_unit)
+
+        # Each stem is one straight cubic segment from its base to its top
+        self.stem_alphas = np.linspace(0, 1, 4)[:, np.newaxis]
+
+        # Every marker is the same small circle, one closed subpath per stem top
+        radius = 0.5 * marker_size * config.frame_width / MARKER_REFERENCE_WIDTH
+        self.marker_shape = Circle(radius=radius).points
+
+        self.stems = VMobject(stroke_color=color, stroke_width=stroke_width)
+        self.markers = VMobject(fill_color=color, fill_opacity=1, stroke_width=0)
+        self.add(self.stems, self.markers)
+
+        if magnitudes is None:
+            magnitudes = np.zeros(len(self.freqs))
+        self.set_magnitudes(magnitudes)
+
+    def get_tops(self):
+        """Scene points of the tip of every stem"""
+        return self.bases + np.outer(self.magnitudes, self.y_unit)
+
+    def set_magnitudes(self, magnitudes):
+        """Move every stem and marker to new magnitudes in one array update"""
+        self.magnitudes = np.asarray(magnitudes, dtype=float)
+        tops = self.get_tops()
+        segments = self.bases[:, np.newaxis] + self.stem_alphas * (tops - self.bases)[:, np.newaxis]
+        self.stems.set_points(segments.reshape(-1, 3))
+        self.markers.set_points((tops[:, np.newaxis] + self.marker_shape).reshape(-1, 3))
+        return self
+
+
+def plot_sampled_signal(axes, x_values, y_values, line_color=YELLOW,
+                        stroke_width=2, n_columns=None):
+    """Plot a dense sampled signal as a single path decimated to screen resolution
+
+    Unlike axes.plot_line_graph no vertex dots are created, and only the
+    min/max samples of each pixel column of the axes are kept (of fewer
+    columns in draft mode)"""
+    if n_columns is None:
+        # Number of output pixels covered by the x axis
+        n_columns = axes.x_length * config.pixel_width / config.frame_width
+        n_columns = int(np.ceil(n_columns * current_detail()))
+    x_values, y_values = decimate_minmax(x_values, y_values, n_columns)
+
+    graph = VMobject(stroke_color=line_color, stroke_width=stroke_width)
+    graph.set_points_as_corners(axes_points(axes, x_values, y_values))
+    return graph
+
+
+def axes_points(axes, x_values, y_values):
+    """Scene points of coordinate arrays: axes are linear, so one affine transform"""
+    origin = axes.c2p(0, 0)
+    return (origin
+            + np.outer(x_values, axes.c2p(1, 0) - origin)
+            + np.outer(y_values, axes.c2p(0, 1) - origin))
+
+
+def plot_function(axes, function=None, x_range=None, components=None,
+                  color=YELLOW, tolerance=None, **kwargs):
+    """Smooth graph of a vectorized function or of a sum of sine components
+
+    A stand-in for axes.plot: function is called on whole arrays of x
+    values instead of once per point, and samples are placed adaptively,
+    densely where the curve bends on screen and sparsely where it is
+    straight. components, a list of (frequency in Hz, amplitude), replaces
+    function and shares its samples through the cache. tolerance is the
+    allowed deviation from the true curve in scene units (default half
+    a pixel, more in draft mode)"""
+    x_min, x_max = (x_range or axes.x_range)[:2]
+    if tolerance is None:
+        tolerance = 0.5 * config.frame_width / config.pixel_width / current_detail()
+    scale = (axes.get_x_unit_size(), axes.get_y_unit_size())
+
+    if components is not None:
+        samples = sample_curve(components, (x_min, x_max), tolerance, scale)
+        x_values, y_values = samples["x"], samples["y"]
+    else:
+        # Start from a few samples per output pixel column and refine from there
+        n_columns = axes.x_length * config.pixel_width / config.frame_width
+        n_initial = max(16, int(n_columns / 4))
+        x_values, y_values = adaptive_samples(function, x_min, x_max, n_initial, tolerance, scale)
+
+    graph = VMobject(color=color, **kwargs)
+    graph.set_points_smoothly(axes_points(axes, x_values, y_values))
+    return graph
+
+
+class SpectrogramImage(ImageMobject):
+    """Pixel image of a SpectrogramPyramid region, redrawn in place by show()
+
+    The pixel array keeps its size, so panning and zooming only write the
+    new view into it instead of creating mobjects"""
+    def __init__(self, pyramid, pixel_width=640, pixel_height=320,
+                 colors=(BLACK, PURPLE, RED, YELLOW, WHITE), **kwargs):
+        super().__init__(np.zeros((pixel_height, pixel_width, 4), dtype=np.uint8), **kwargs)
+        self.pyramid = pyramid
+        # One RGBA colour per stored decibel level
+        self.palette = np.array(
+            [color_to_int_rgba(color) for color in color_gradient(colors, 256)], dtype=np.uint8
+        )
+
+    def show(self, t_start, t_end, f_start, f_end):
+        height, width = self.pixel_array.shape[:2]
+        levels = self.pyramid.view(t_start, t_end, f_start, f_end, width, height)
+        self.pixel_array[...] = self.palette[levels]
+        return self
+
+
+def complex_points(values):
+    """Scene points of an array of complex numbers (x = real part, y = imaginary part)"""
+    values = np.asarray(values)
+    return np.column_stack([values.real, values.imag, np.zeros(len(values))])
+
+
+def mobject_outline(mobject, samples_per_curve=8):
+    """Complex points along every Bezier curve of a mobject family, such as an SVG
+
+    All curves are evaluated at once with the cubic Bernstein weights"""
+    curves = np.concatenate([
+        member.points for member in mobject.family_members_with_points()
+    ]).reshape(-1, 4, 3)
+    t = np.linspace(0, 1, samples_per_curve, endpoint=False)[:, np.newaxis]
+    weights = np.hstack([(1 - t)**3, 3 * (1 - t)**2 * t, 3 * (1 - t) * t**2, t**3])
+    samples = np.einsum("sk,ckd->csd", weights, curves).reshape(-1, 3)
+    return samples[:, 0] + 1j * samples[:, 1]
+
+
+class Epicycles(VGroup):
+    """Chain of rotating vectors of a Fourier series, drawn with four mobjects
+
+    All vectors form one polyline and all circles one multi-path VMobject,
+    so set_time moves thousands of terms with a single cumulative sum and
+    a few array writes instead of one mobject per vector"""
+    def __init__(self, freqs, coeffs, origin=ORIGIN, n_circles=50, n_trace_points=2048,
+                 vector_color=WHITE, circle_color=BLUE, trace_color=YELLOW, **kwargs):
+        super().__init__(**kwargs)
+        self.freqs, self.coeffs = freqs, coeffs
+        self.origin = np.array(origin, dtype=float)
+        self.n_circles = min(n_circles, len(coeffs))
+        self.radii = np.abs(coeffs[:self.n_circles])
+        self.unit_circle = Circle(radius=1).points  # Bezier points reused for every circle
+        self.trace_points = complex_points(series_path(freqs, coeffs, n_trace_points))
+
+        self.circles = VMobject(stroke_color=circle_color, stroke_width=1, stroke_opacity=0.4)
+        self.vectors = VMobject(stroke_color=vector_color, stroke_width=1.5)
+        self.trace = VMobject(stroke_color=trace_color, stroke_width=3)
+        self.add(self.circles, self.vectors, self.trace)
+        self.set_time(0)
+
+    def set_time(self, t):
+        """Place the chain at time t in [0, 1] and trace the path drawn so far"""
+        chain = complex_points(np.concatenate([[0], epicycle_tips(self.freqs, self.coeffs, t)]))
+        chain += self.origin
+        self.vectors.set_points_as_corners(chain)
+
+        # Circle k is centred on the tail of vector k
+        centres = chain[:self.n_circles, np.newaxis]
+        circles = centres + self.radii[:, np.newaxis, np.newaxis] * self.unit_circle
+        self.circles.set_points(circles.reshape(-1, 3))
+
+        n_traced = int(np.clip(t, 0, 1) * (len(self.trace_points) - 1)) + 1
+        self.trace.set_points_as_corners(self.origin + self.trace_points[:max(n_traced, 2)])
+        self.tip = chain[-1]
+        return self
@@ -0,0 +1,248 @@
+"""Generate the Text and MathTex files of every scene ahead of rendering
+
+    python prewarm.py                       # both lesson files, one job per core
+    python prewarm.py fourier.py -j 4 --media-dir media
+    python render_all.py --prewarm
+
+Manim keeps the SVG of every Text (laid out by Pango) and every MathTex
+(compiled with LaTeX) in the media directory, keyed by its string and
+font settings, and only generates the ones it has not seen. Scenes build
+theirs one after another while they are constructed, so a fresh checkout
+spends much of its first render in LaTeX and Pango.
+
+The labels are collected by reading the scene files: every Text,
+MarkupText, MathTex and Tex call, plus the MathTex made by
+get_axis_labels. Names in a call are resolved where the source pins
+them down: loop variables over literal lists and parameters of local
+helpers called with literals, e.g. the singers of ConclusionScene.
+Labels that depend on computed values cannot be known in advance and are
+left to the render. Every label is then built once in a process pool, so
+scene construction finds the files already there.
+"""
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+import time
+
+from profiling import TEXT_CLASSES
+
+
+SCENE_FILES = ["animation.py", "fourier.py"]
+
+# Methods that create MathTex labels from these keyword arguments
+LABEL_METHODS = {"get_axis_labels": ("x_label", "y_label")}
+
+# Every character DecimalNumber typesets (axis numbers, readouts), one Tex file each
+EXTRA_LABELS = ["DecimalNumber(-1234567890.0, num_decimal_places=1)"]
+
+UNKNOWN = object()  # Placeholder for values that are not literals, such as lambdas
+
+
+def literal(node):
+    """Value of a literal expression; lists and tuples may hold UNKNOWN elements"""
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        pass
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [literal(element) for element in node.elts]
+    return UNKNOWN
+
+
+def has_unknown(value):
+    if isinstance(value, (list, tuple)):
+        return any(has_unknown(element) for element in value)
+    return value is UNKNOWN
+
+
+def bind(target, value, names):
+    """Assign value to a for-loop target as Python would; False if it cannot"""
+    if isinstance(target, ast.Name):
+        names[target.id] = value
+        return True
+    if isinstance(target, (ast.Tuple, ast.List)):
+        if not isinstance(value, (list, tuple)) or len(value) != len(target.elts):
+            return False
+        return all(bind(element, item, names) for element, item in zip(target.elts, value))
+    return False
+
+
+def loop_values(node, function):
+    """Values a for loop iterates over, or None when they are not in the source"""
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id == "enumerate" and len(node.args) == 1):
+        values = loop_values(node.args[0], function)
+        return None if values is None else [list(pair) for pair in enumerate(values)]
+    if isinstance(node, ast.Name) and function is not None:
+        # A list assigned earlier in the same function
+        assigned = [
+            statement.value for statement in ast.walk(function)
+            if isinstance(statement, ast.Assign) and len(statement.targets) == 1
+            and isinstance(statement.targets[0], ast.Name) and statement.targets[0].id == node.id
+        ]
+        return loop_values(assigned[-1], None) if assigned else None
+    values = literal(node)
+    return values if isinstance(values, (list, tuple)) else None
+
+
+def call_bindings(function, module):
+    """Parameter values of every call of a local function made with literal arguments"""
+    parameters = [argument.arg for argument in function.args.args]
+    bindings = []
+    for node in ast.walk(module):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id == function.name):
+            continue
+        names = {name: literal(value) for name, value in zip(parameters, node.args)}
+        names.update({keyword.arg: literal(keyword.value) for keyword in node.keywords if keyword.arg})
+        bindings.append(names)
+    return bindings
+
+
+def scope_bindings(node, parents, module):
+    """Every combination of values the names around node take, innermost scope first"""
+    environments = [{}]
+    child, scope = node, parents.get(node)
+    while scope is not None and not isinstance(scope, ast.ClassDef):
+        options = None
+        function = next((p for p in ancestors(scope, parents)
+                         if isinstance(p, (ast.FunctionDef, ast.AsyncFunctionDef))), None)
+        if isinstance(scope, ast.For) and child is not scope.iter:
+            values = loop_values(scope.iter, function)
+            if values is not None:
+                options = []
+                for value in values:
+                    names = {}
+                    if bind(scope.target, value, names):
+                        options.append(names)
+        elif isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)) and scope.name != "construct":
+            options = call_bindings(scope, module) or None
+        if options is not None:
+            environments = [{**outer, **inner} for inner in environments for outer in options]
+        child, scope = scope, parents.get(scope)
+    return environments
+
+
+def ancestors(node, parents):
+    while node is not None:
+        yield node
+        node = parents.get(node)
+
+
+def local_names(node, parents):
+    """Names assigned in the functions around node, which only exist while the scene runs"""
+    names = set()
+    for scope in ancestors(node, parents):
+        if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.update(argument.arg for argument in scope.args.args)
+            names.update(
+                name.id for name in ast.walk(scope)
+                if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store)
+            )
+    # Comprehension variables of the call itself are bound by the call
+    return names - {name.id for name in ast.walk(node)
+                    if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Store)}
+
+
+def label_calls(tree, code):
+    """(call node, label source, node of the label's arguments) of every label a module creates"""
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        if isinstance(node.func, ast.Name) and node.func.id in TEXT_CLASSES:
+            yield node, ast.get_source_segment(code, node), node
+        elif isinstance(node.func, ast.Attribute) and node.func.attr in LABEL_METHODS:
+            for keyword in node.keywords:
+                if keyword.arg in LABEL_METHODS[node.func.attr]:
+                    yield node, f"MathTex({ast.get_source_segment(code, keyword.value)})", keyword.value
+
+
+def collect_labels(paths):
+    """(path, line, expression, names) of every label whose arguments are known statically
+
+    The expression is evaluated against manim's namespace plus names.
+    Also returns the number of label calls that depend on computed values"""
+    labels, seen, n_dynamic = [], set(), 0
+    for path in paths:
+        with open(path, encoding="utf-8") as source:
+            code = source.read()
+        tree = ast.parse(code, filename=path)
+        parents = {child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)}
+
+        for node, expression, arguments in label_calls(tree, code):
+            used = {name.id for name in ast.walk(arguments) if isinstance(name, ast.Name)}
+            local = used & local_names(arguments, parents)
+            resolved = False
+            for names in scope_bindings(node, parents, tree):
+                names = {name: value for name, value in names.items() if name in used}
+                if local - set(names) or has_unknown(list(names.values())):
+                    continue
+                key = (expression, repr(sorted(names.items())))
+                resolved = True
+                if key not in seen:
+                    seen.add(key)
+                    labels.append((path, node.lineno, expression, names))
+            n_dynamic += not resolved
+
+    labels += [("<prewarm>", 0, expression, {}) for expression in EXTRA_LABELS]
+    return labels, n_dynamic
+
+
+def build_label(expression, names, media_dir=None):
+    """Create one label in a worker so its files land in the media directory
+
+    Returns the seconds it took, or the error when the label's names are
+    not known until the scene runs"""
+    import manim
+
+    namespace = dict(vars(manim))
+    settings = {"verbosity": "WARNING"}
+    if media_dir is not None:
+        settings["media_dir"] = media_dir
+    start = time.perf_counter()
+    with manim.tempconfig(settings):
+        try:
+            eval(expression, namespace, dict(names))
+        except Exception as error:  # Names only bound at render time, bad arguments
+            return None, f"{type(error).__name__}: {error}"
+    return time.perf_counter() - start, None
+
+
+def prewarm(paths, jobs, media_dir=None):
+    """Build every statically known label of the scene files in a process pool"""
+    start = time.perf_counter()
+    labels, n_dynamic = collect_labels(paths)
+    built, seconds = 0, 0.0
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(labels)))) as pool:
+        futures = {
+            pool.submit(build_label, expression, names, media_dir): (path, line, expression)
+            for path, line, expression, names in labels
+        }
+        for future in as_completed(futures):
+            path, line, expression = futures[future]
+            elapsed, error = future.result()
+            if error is None:
+                built += 1
+                seconds += elapsed
+            else:
+                n_dynamic += 1
+                print(f"  skipped {path}:{line} {expression.splitlines()[0]} ({error})")
+
+    print(f"Prewarmed {built} labels ({seconds:.1f}s of LaTeX and text layout) "
+          f"in {time.perf_counter() - start:.1f}s; {n_dynamic} depend on values computed while rendering")
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Text and MathTex files of the scenes in parallel")
+    parser.add_argument("files", nargs="*", default=SCENE_FILES, help="Scene source files")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("--media-dir", help="Media directory the scenes render into (default: manim's)")
+    args = parser.parse_args(argv)
+    prewarm(args.files, args.jobs, args.media_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""Opt-in per-animation profiling of scene renders
+
+    python profiling.py fourier.py FFT -q l -o fft_trace.json
+    python render_all.py --profile traces/
+
+A profiled scene records every self.play/self.wait call. For each call it
+stores the time spent in construct code since the previous call (and how
+much of that went to Text/MathTex generation), animation setup,
+interpolation, mobject updaters and frame rendering, plus the number of
+mobjects in every rendered frame. The trace is written as JSON and a
+summary table is printed when the render finishes. Scenes do not need
+any changes: the profiler subclasses them at render time.
+"""
+import argparse
+from contextlib import contextmanager
+import json
+import time
+
+
+# Text-like mobjects whose creation (Pango layout, LaTeX, SVG parsing) is timed separately
+TEXT_CLASSES = ("Text", "MarkupText", "MathTex", "Tex")
+
+TIMING_FIELDS = ("construct", "text", "setup", "interpolate", "updaters", "render", "other")
+
+
+@contextmanager
+def timed_text_creation(on_done):
+    """Call on_done(seconds) after each outermost Text/MathTex construction"""
+    import manim
+
+    depth = [0]
+    originals = {}
+
+    def wrap(cls, original):
+        def __init__(self, *args, **kwargs):
+            depth[0] += 1
+            start = time.perf_counter()
+            try:
+                original(self, *args, **kwargs)
+            finally:
+                depth[0] -= 1
+                if depth[0] == 0:  # MathTex builds Tex parts, only count the outer one
+                    on_done(time.perf_counter() - start)
+        return __init__
+
+    for name in TEXT_CLASSES:
+        cls = getattr(manim, name)
+        originals[cls] = cls.__dict__.get("__init__")
+        cls.__init__ = wrap(cls, cls.__init__)
+    try:
+        yield
+    finally:
+        for cls, original in originals.items():
+            if original is None:
+                del cls.__init__
+            else:
+                cls.__init__ = original
+
+
+class ProfiledScene:
+    """Mixin recording a timing breakdown of every play/wait of a Scene"""
+    trace_path = None
+
+    def setup(self):
+        super().setup()
+        self.profile = {"scene": type(self).__name__, "calls": []}
+        self._call = None
+        self._last_call_end = time.perf_counter()
+        self._text_seconds = 0.0
+        self._nested = []  # Seconds spent in phases nested in each running phase
+
+        # Frame rendering goes through the renderer, so time it there
+        render_frame = self.renderer.render
+
+        def timed_render(scene, *args, **kwargs):
+            with self._phase("render"):
+                result = render_frame(scene, *args, **kwargs)
+            if self._call is not None:
+                self._call["mobjects_per_frame"].append(len(scene.mobjects))
+                self._call["family_per_frame"].append(len(scene.get_mobject_family_members()))
+            return result
+
+        self.renderer.render = timed_render
+
+    @contextmanager
+    def _phase(self, field):
+        """Time a phase exclusively: phases nested in it (such as the updaters
+        Wait runs while compiling its animation) only count for themselves"""
+        if self._call is None:
+            yield
+            return
+        start = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._call[f"{field}_seconds"] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def _add_text_time(self, seconds):
+        self._text_seconds += seconds
+
+    def _record(self, kind, animation_names, call, *args, **kwargs):
+        start = time.perf_counter()
+        self._call = {
+            "index": len(self.profile["calls"]),
+            "kind": kind,
+            "animations": animation_names,
+            "construct_seconds": start - self._last_call_end,
+            "text_seconds": self._text_seconds,
+            "setup_seconds": 0.0,
+            "interpolate_seconds": 0.0,
+            "updaters_seconds": 0.0,
+            "render_seconds": 0.0,
+            "mobjects_per_frame": [],
+            "family_per_frame": [],
+        }
+        self._text_seconds = 0.0
+        try:
+            return call(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            entry = self._call
+            entry["total_seconds"] = end - start
+            entry["other_seconds"] = entry["total_seconds"] - sum(
+                entry[f"{field}_seconds"] for field in ("setup", "interpolate", "updaters", "render")
+            )
+            entry["frames"] = len(entry["mobjects_per_frame"])
+            self.profile["calls"].append(entry)
+            self._call = None
+            self._last_call_end = end
+
+    def play(self, *args, **kwargs):
+        if self._call is not None:  # wait() is implemented with play()
+            return super().play(*args, **kwargs)
+        names = [
+            "animate" if type(arg).__name__ == "_AnimationBuilder" else type(arg).__name__
+            for arg in args
+        ]
+        return self._record("play", names, super().play, *args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        return self._record("wait", ["Wait"], super().wait, *args, **kwargs)
+
+    def compile_animation_data(self, *args, **kwargs):
+        with self._phase("setup"):
+            return super().compile_animation_data(*args, **kwargs)
+
+    def begin_animations(self):
+        with self._phase("setup"):
+            return super().begin_animations()
+
+    def update_to_time(self, t):
+        with self._phase("interpolate"):
+            return super().update_to_time(t)
+
+    def update_mobjects(self, dt):
+        with self._phase("updaters"):
+            return super().update_mobjects(dt)
+
+    def render(self, *args, **kwargs):
+        start = time.perf_counter()
+        with timed_text_creation(lambda seconds: self._add_text_time(seconds)):
+            result = super().render(*args, **kwargs)
+        self.profile["trailing_construct_seconds"] = time.perf_counter() - self._last_call_end
+        self.profile["trailing_text_seconds"] = self._text_seconds
+        self.profile["total_seconds"] = time.perf_counter() - start
+
+        if self.trace_path:
+            with open(self.trace_path, "w") as trace:
+                json.dump(self.profile, trace, indent=2)
+        print_summary(self.profile)
+        return result
+
+
+def profiled(scene_class, trace_path=None):
+    """Subclass of scene_class that records a profile and writes it to trace_path"""
+    return type(scene_class.__name__, (ProfiledScene, scene_class), {"trace_path": trace_path})
+
+
+def print_summary(profile):
+    """Print one row per play/wait call and the totals of each timing field"""
+    header = f"{'#':>3} {'call':<28}" + "".join(f"{field:>12}" for field in TIMING_FIELDS)
+    header += f"{'frames':>8}{'max mobs':>10}"
+    print(f"\nProfile of {profile['scene']} (seconds)")
+    print(header)
+    print("-" * len(header))
+
+    totals = dict.fromkeys(TIMING_FIELDS, 0.0)
+    for call in profile["calls"]:
+        label = f"{call['kind']}: {', '.join(call['animations'])}"
+        row = f"{call['index']:>3} {label[:28]:<28}"
+        for field in TIMING_FIELDS:
+            totals[field] += call[f"{field}_seconds"]
+            row += f"{call[f'{field}_seconds']:12.3f}"
+        row += f"{call['frames']:8d}{max(call['family_per_frame'], default=0):10d}"
+        print(row)
+
+    totals["construct"] += profile.get("trailing_construct_seconds", 0.0)
+    totals["text"] += profile.get("trailing_text_seconds", 0.0)
+    print("-" * len(header))
+    print(f"{'':>3} {'total':<28}" + "".join(f"{totals[field]:12.3f}" for field in TIMING_FIELDS))
+
+
+def main(argv=None):
+    from manim import tempconfig
+
+    from render_all import QUALITIES, load_scene_class
+
+    parser = argparse.ArgumentParser(description="Render one scene with per-animation profiling")
+    parser.add_argument("file", help="Scene source file")
+    parser.add_argument("scene", help="Scene class name")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("-o", "--output", help="JSON trace (default: <Scene>_profile.json)")
+    args = parser.parse_args(argv)
+
+    scene_class = profiled(
+        load_scene_class(args.file, args.scene),
+        args.output or f"{args.scene}_profile.json"
+    )
+    with tempconfig({"quality": QUALITIES[args.quality], "input_file": args.file}):
+        scene_class().render()
+
+
+if __name__ == "__main__":
+    main()
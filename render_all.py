@@ -0,0 +1,316 @@
+"""Render every scene of the lesson in parallel and join them into one video
+
+    python render_all.py                    # all scenes, low quality, one job per core
+    python render_all.py -q h -j 8 -o lesson.mp4
+    python render_all.py --scenes IntroductionScene FFT
+    python render_all.py --incremental      # only re-render changed scenes
+    python render_all.py --profile traces/  # per-animation timing traces
+    python render_all.py --cache-background # keep static backgrounds between plays
+    python render_all.py --prewarm          # build all Text/MathTex files up front
+
+Scenes are found by reading the source files, so the driver itself does
+not import manim. Each scene renders in its own worker process and the
+finished videos are concatenated in scene order with ffmpeg.
+
+Every rendered video is also stored in SCENE_CACHE_DIR under a
+fingerprint of everything that determines it: the scene's source
+(construct and the parameters written in it), the local modules it
+imports, data files it names, the quality, the draft and layer settings
+in the environment and the manim version. In
+incremental mode a scene whose fingerprint already has a video there is
+not rendered again.
+"""
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+from importlib import metadata
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SCENE_FILES = ["animation.py", "fourier.py"]
+
+# Rendered scene videos, named by scene and fingerprint
+SCENE_CACHE_DIR = os.path.join("media", "scene_cache")
+
+# Manim base classes a lesson scene may derive from
+SCENE_BASES = {"Scene", "MovingCameraScene", "ZoomedScene", "ThreeDScene"}
+
+# Scenes that need live input, rendered only when asked for by name
+ON_DEMAND_SCENES = {"StreamingSpectrum"}
+
+# Environment settings that change what a scene draws
+SCENE_ENV = ("FOURIER_DRAFT", "FOURIER_LAYERS")
+
+# Environment variables naming an input file of the scenes that read them, with their defaults
+SCENE_FILE_ENV = {"FOURIER_EPICYCLE_SVG": "", "FOURIER_SPECTROGRAM_WAV": "Fayrouz.wav"}
+
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+
+def find_scenes(paths, on_demand=False):
+    """(path, class name) of every module-level Scene subclass, in file order
+
+    Scenes in ON_DEMAND_SCENES are left out unless on_demand is set"""
+    scenes = []
+    for path in paths:
+        with open(path, encoding="utf-8") as source:
+            tree = ast.parse(source.read(), filename=path)
+
+        known_bases = set(SCENE_BASES)
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            base_names = {base.id for base in node.bases if isinstance(base, ast.Name)}
+            if base_names & known_bases:
+                known_bases.add(node.name)  # Scenes may derive from other scenes
+                if on_demand or node.name not in ON_DEMAND_SCENES:
+                    scenes.append((path, node.name))
+    return scenes
+
+
+def local_dependencies(path, seen=None):
+    """Source files of the local modules a file imports, recursively"""
+    seen = set() if seen is None else seen
+    directory = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename=path)
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            candidate = os.path.join(directory, name.split(".")[0] + ".py")
+            if os.path.exists(candidate) and candidate not in seen:
+                seen.add(candidate)
+                local_dependencies(candidate, seen)
+    return sorted(seen)
+
+
+def scene_fingerprint(path, scene_name, quality):
+    """Hash of everything that determines the video of one scene"""
+    with open(path, encoding="utf-8") as source:
+        code = source.read()
+    module = ast.parse(code)
+    scene_node = next(
+        node for node in module.body
+        if isinstance(node, ast.ClassDef) and node.name == scene_name
+    )
+
+    digest = hashlib.sha256()
+    digest.update(f"{scene_name}:{quality}:{metadata.version('manim')}".encode())
+    digest.update(repr([os.environ.get(name) for name in SCENE_ENV]).encode())
+    digest.update(ast.get_source_segment(code, scene_node).encode())
+
+    # Module-level code shared by all scenes of the file (imports, constants, helpers)
+    for node in module.body:
+        if not isinstance(node, ast.ClassDef):
+            digest.update(ast.get_source_segment(code, node).encode())
+
+    for dependency in local_dependencies(path):
+        with open(dependency, "rb") as source:
+            digest.update(source.read())
+
+    # Data files named in the scene (such as voice recordings), by size and age
+    for node in ast.walk(scene_node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str) and os.path.isfile(node.value):
+            stat = os.stat(node.value)
+            digest.update(f"{node.value}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    # Input files chosen through the environment, by content
+    scene_code = ast.get_source_segment(code, scene_node)
+    for name, default in SCENE_FILE_ENV.items():
+        if f'"{name}"' not in scene_code:
+            continue
+        input_file = os.environ.get(name, default)
+        digest.update(f"{name}={input_file}".encode())
+        if os.path.isfile(input_file):
+            with open(input_file, "rb") as data:
+                for block in iter(lambda: data.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def cached_video(scene_name, fingerprint):
+    return os.path.join(SCENE_CACHE_DIR, f"{scene_name}-{fingerprint[:16]}.mp4")
+
+
+def load_scene_class(path, scene_name):
+    """Import a scene file and return one of its Scene classes"""
+    import importlib.util
+
+    # Scene files import their helper modules from their own directory
+    scene_dir = os.path.dirname(os.path.abspath(path))
+    if scene_dir not in sys.path:
+        sys.path.insert(0, scene_dir)
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, scene_name)
+
+
+def render_scene(path, scene_name, quality, profile_dir=None, cache_background=False,
+                 params=None, output_file=None):
+    """Render one scene in a worker process, returning its video and timing
+
+    params overrides entries of the scene's params dict, and output_file
+    names the video so variants of one scene do not overwrite each other"""
+    from manim import tempconfig
+    from fft_backend import set_backend
+
+    # Scenes already render one per core, so FFTs run on one thread unless asked otherwise
+    # (the backend may have been inherited from the parent process, so rebuild it)
+    workers = int(os.environ.get("FOURIER_FFT_WORKERS", 1))
+    set_backend(os.environ.get("FOURIER_FFT_BACKEND", "auto"), workers)
+
+    scene_class = load_scene_class(path, scene_name)
+    if params:
+        overrides = {"params": {**scene_class.params, **params}}
+        scene_class = type(scene_class.__name__, (scene_class,), overrides)
+    if cache_background:
+        from background import CachedBackgroundScene, with_cached_background
+        if not issubclass(scene_class, CachedBackgroundScene):
+            scene_class = with_cached_background(scene_class)
+    if profile_dir is not None:
+        from profiling import profiled
+        scene_class = profiled(scene_class, os.path.join(profile_dir, f"{scene_name}.json"))
+
+    settings = {"quality": quality, "input_file": path, "verbosity": "WARNING"}
+    if output_file is not None:
+        settings["output_file"] = output_file
+        # Variants of a scene share its name, so each gets its own partial movie files:
+        # otherwise parallel workers reuse or clean up each other's segments
+        settings["partial_movie_dir"] = os.path.join(
+            "{media_dir}", "videos", "{module_name}", "{quality}", "partial_movie_files",
+            f"{scene_name}-{output_file}"
+        )
+
+    start = time.perf_counter()
+    with tempconfig(settings):
+        scene = scene_class()
+        scene.render()
+        video = str(scene.renderer.file_writer.movie_file_path)
+    return video, time.perf_counter() - start
+
+
+def concatenate(videos, output):
+    """Join equally encoded videos without re-encoding"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is required to concatenate the scene videos")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as playlist:
+        for video in videos:
+            escaped = os.path.abspath(video).replace("'", "'\\''")
+            playlist.write(f"file '{escaped}'\n")
+    try:
+        subprocess.run(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+             "-i", playlist.name, "-c", "copy", output],
+            check=True
+        )
+    finally:
+        os.remove(playlist.name)
+
+
+def render_all(scenes, quality, jobs, output, incremental=False, profile_dir=None,
+               cache_background=False):
+    """Render scenes in a process pool, report progress and join the videos
+
+    With incremental set, scenes whose fingerprint already has a cached
+    video are reused instead of rendered. With profile_dir set, every
+    rendered scene writes a per-animation timing trace there. With
+    cache_background set, every scene keeps its static background
+    between plays"""
+    timings = {}
+    start = time.perf_counter()
+
+    videos = {}
+    to_render = []
+    for path, scene_name in scenes:
+        videos[scene_name] = cached_video(scene_name, scene_fingerprint(path, scene_name, quality))
+        if incremental and os.path.exists(videos[scene_name]):
+            print(f"{scene_name} unchanged, reusing {videos[scene_name]}")
+        else:
+            to_render.append((path, scene_name))
+
+    os.makedirs(SCENE_CACHE_DIR, exist_ok=True)
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(to_render)))) as pool:
+        futures = {
+            pool.submit(render_scene, path, scene_name, quality, profile_dir, cache_background): scene_name
+            for path, scene_name in to_render
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            scene_name = futures[future]
+            video, timings[scene_name] = future.result()
+            shutil.copyfile(video, videos[scene_name])
+            print(f"[{done}/{len(to_render)}] {scene_name} rendered in {timings[scene_name]:.1f}s")
+
+    print("\nScene timings:")
+    for _, scene_name in scenes:
+        if scene_name in timings:
+            print(f"  {scene_name:<32}{timings[scene_name]:8.1f}s")
+        else:
+            print(f"  {scene_name:<32}{'cached':>9}")
+    print(f"  {'Total (wall clock)':<32}{time.perf_counter() - start:8.1f}s")
+
+    concatenate([videos[scene_name] for _, scene_name in scenes], output)
+    print(f"\nWrote {output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render all scenes in parallel into one video")
+    parser.add_argument("files", nargs="*", default=SCENE_FILES, help="Scene source files")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("-o", "--output", default="lesson.mp4")
+    parser.add_argument("--scenes", nargs="+", help="Only these scenes, in this order")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse cached videos of scenes whose inputs have not changed")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="Write a per-animation timing trace of every rendered scene to DIR")
+    parser.add_argument("--cache-background", action="store_true",
+                        help="Rasterize unchanged background mobjects once instead of once per play")
+    parser.add_argument("--prewarm", action="store_true",
+                        help="Generate the Text and MathTex files of all scenes in parallel first")
+    args = parser.parse_args(argv)
+
+    scenes = find_scenes(args.files, on_demand=bool(args.scenes))
+    if args.scenes:
+        by_name = {scene_name: (path, scene_name) for path, scene_name in scenes}
+        missing = [name for name in args.scenes if name not in by_name]
+        if missing:
+            parser.error(f"Unknown scenes: {', '.join(missing)}")
+        scenes = [by_name[name] for name in args.scenes]
+
+    if args.prewarm:
+        from prewarm import prewarm
+        prewarm(sorted({path for path, _ in scenes}), args.jobs)
+
+    render_all(
+        scenes, QUALITIES[args.quality], args.jobs, args.output,
+        args.incremental, args.profile, args.cache_background
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Out-of-core multi-resolution spectrogram pyramid
+
+    python spectrogram.py Fayrouz.wav --window-size 2048 --hop 512
+
+build_pyramid streams a recording through the batched window FFT and
+stores its spectrogram as 8-bit decibels, level by level. Level 0 is the
+full-resolution STFT; every further level halves both the time and the
+frequency resolution by max-pooling 2x2 cells, so peaks survive zooming
+out. Each level is a single time-major .npy file that is opened
+memory-mapped: a tile of frames is a contiguous range of the file, and a
+view only reads the frames it displays from the coarsest level that still
+has enough detail. Memory stays bounded by one chunk of frames while
+building and by the output image while viewing, however long the audio.
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+from audio import iter_frame_spectra, read_wav
+from cache import content_key
+
+
+# Pyramids are built once per recording and analysis settings and kept here
+PYRAMID_DIR = os.environ.get("FOURIER_PYRAMID_DIR", "pyramids")
+
+# dBFS range stored as 0-255: a full-scale sine peaks at 255, -100 dB and below is 0
+DB_RANGE = (-100, 0)
+
+# Frames computed and downsampled per step while building
+TILE_FRAMES = 256
+
+
+def to_levels(spectra, window_size):
+    """(frames x bins) magnitudes as uint8 decibels over DB_RANGE"""
+    db = 20 * np.log10(np.maximum(2.0/window_size * spectra, 1e-12))
+    low, high = DB_RANGE
+    return np.clip((db - low) * (255 / (high - low)), 0, 255).astype(np.uint8)
+
+
+def downsample(block):
+    """Max-pool 2x2 cells of a (frames x bins) block, padding odd edges with silence"""
+    frames, bins = block.shape
+    padded = np.zeros((frames + frames % 2, bins + bins % 2), dtype=block.dtype)
+    padded[:frames, :bins] = block
+    return padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).max(axis=(1, 3))
+
+
+def synthetic_recording(duration=600, sample_rate=8000):
+    """Ten minutes of a slow sweep over a few harmonics, for when there is no recording"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    fundamental = 200 * 2 ** (2 * t / duration)  # Two octaves over the whole duration
+    phase = 2 * np.pi * np.cumsum(fundamental) / sample_rate
+    signal = sum(0.5 / harmonic * np.sin(harmonic * phase) for harmonic in range(1, 6))
+    return signal.astype(np.float32)[:, np.newaxis], sample_rate
+
+
+def build_pyramid(samples, sample_rate, directory, window_size=2048, hop_size=512, min_frames=1024):
+    """Write the spectrogram pyramid of (frames x channels) samples to directory
+
+    Levels are added until one has at most min_frames frames. Returns the
+    directory, ready for SpectrogramPyramid"""
+    os.makedirs(directory, exist_ok=True)
+    n_frames = max(0, (len(samples) - window_size) // hop_size + 1)
+    n_bins = (window_size - 1) // 2
+    if n_frames == 0:
+        raise ValueError("Recording is shorter than one analysis window")
+
+    level = np.lib.format.open_memmap(
+        os.path.join(directory, "level0.npy"), mode="w+", dtype=np.uint8, shape=(n_frames, n_bins)
+    )
+    row = 0
+    for spectra in iter_frame_spectra(samples, window_size, hop_size, TILE_FRAMES):
+        level[row:row + len(spectra)] = to_levels(spectra, window_size)
+        row += len(spectra)
+    level.flush()
+
+    shapes = [level.shape]
+    while level.shape[0] > min_frames and level.shape[1] > 1:
+        coarser = np.lib.format.open_memmap(
+            os.path.join(directory, f"level{len(shapes)}.npy"), mode="w+", dtype=np.uint8,
+            shape=((level.shape[0] + 1) // 2, (level.shape[1] + 1) // 2)
+        )
+        for start in range(0, level.shape[0], 2 * TILE_FRAMES):
+            coarser[start // 2:(start + 2 * TILE_FRAMES + 1) // 2] = downsample(
+                level[start:start + 2 * TILE_FRAMES]
+            )
+        coarser.flush()
+        del level
+        level = coarser
+        shapes.append(level.shape)
+
+    # Written last, so an interrupted build is never mistaken for a finished one
+    with open(os.path.join(directory, "pyramid.json"), "w") as meta:
+        json.dump({
+            "sample_rate": sample_rate,
+            "window_size": window_size,
+            "hop_size": hop_size,
+            "n_samples": len(samples),
+            "db_range": DB_RANGE,
+            "levels": shapes,
+        }, meta, indent=2)
+    return directory
+
+
+class SpectrogramPyramid:
+    """Memory-mapped spectrogram pyramid that renders views of any region"""
+    def __init__(self, directory):
+        with open(os.path.join(directory, "pyramid.json")) as meta:
+            self.meta = json.load(meta)
+        self.levels = [
+            np.load(os.path.join(directory, f"level{index}.npy"), mmap_mode="r")
+            for index in range(len(self.meta["levels"]))
+        ]
+        self.sample_rate = self.meta["sample_rate"]
+        self.frame_seconds = self.meta["hop_size"] / self.sample_rate
+        self.bin_hz = self.sample_rate / self.meta["window_size"]
+        self.duration = self.meta["n_samples"] / self.sample_rate
+        self.max_freq = self.levels[0].shape[1] * self.bin_hz
+
+    def level_for(self, n_frames, n_bins, width, height):
+        """Coarsest level that still has a frame per pixel column and a bin per pixel row"""
+        detail = min(n_frames / width, n_bins / height)
+        return int(np.clip(np.floor(np.log2(max(detail, 1))), 0, len(self.levels) - 1))
+
+    def view(self, t_start, t_end, f_start, f_end, width, height):
+        """(height x width) uint8 image of a time/frequency region, low frequencies at the bottom
+
+        Only the frames sampled by the pixel columns are read from the
+        file. Areas outside the recording are left at 0"""
+        # Level-0 frame i starts at i * hop, bin k is at (k + 1) * bin_hz
+        frame_range = np.array([t_start, t_end]) / self.frame_seconds
+        bin_range = np.array([f_start, f_end]) / self.bin_hz - 1
+        index = self.level_for(np.ptp(frame_range), np.ptp(bin_range), width, height)
+        level, scale = self.levels[index], 2 ** index
+
+        rows = np.floor(np.linspace(*frame_range, width, endpoint=False) / scale).astype(int)
+        edges = np.floor(np.linspace(*bin_range, height + 1) / scale).astype(int)
+        cols, cols_end = edges[:-1], min(max(edges[-1], edges[-2] + 1), level.shape[1])
+        row_ok = (rows >= 0) & (rows < level.shape[0])
+        col_ok = (cols >= 0) & (cols < level.shape[1])
+        image = np.zeros((height, width), dtype=np.uint8)
+        if cols_end <= 0 or not col_ok.any() or not row_ok.any():
+            return image  # The region misses every bin or frame of the recording
+
+        # Zoomed in, neighbouring columns share frames: read each one once
+        unique_rows, inverse = np.unique(rows[row_ok], return_inverse=True)
+        frames = level[unique_rows][:, :cols_end]
+
+        # Each pixel row takes the loudest bin it spans, so narrow peaks are never skipped
+        pooled = np.maximum.reduceat(frames, np.clip(cols, 0, cols_end - 1), axis=1)
+        image[np.ix_(col_ok, row_ok)] = pooled[inverse][:, col_ok].T
+        return image[::-1]
+
+
+def pyramid_for(recording=None, window_size=2048, hop_size=512):
+    """Pyramid of a WAV recording, or of synthetic_recording() when recording is None
+
+    Built into PYRAMID_DIR on first use and reused while the recording is unchanged"""
+    params = {"window_size": window_size, "hop_size": hop_size}
+    if recording is not None:
+        stat = os.stat(recording)
+        params.update(
+            recording=os.path.abspath(recording), size=stat.st_size, mtime_ns=stat.st_mtime_ns
+        )
+    directory = os.path.join(PYRAMID_DIR, content_key("pyramid", params)[:16])
+
+    if not os.path.exists(os.path.join(directory, "pyramid.json")):
+        samples, sample_rate = read_wav(recording) if recording else synthetic_recording()
+        build_pyramid(samples, sample_rate, directory, window_size, hop_size)
+    return SpectrogramPyramid(directory)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the spectrogram pyramid of a recording")
+    parser.add_argument("recording", nargs="?", help="WAV file (default: synthetic sweep)")
+    parser.add_argument("--window-size", type=int, default=2048, help="Samples")
+    parser.add_argument("--hop", type=int, default=512, help="Samples")
+    args = parser.parse_args(argv)
+
+    pyramid = pyramid_for(args.recording, args.window_size, args.hop)
+    print(f"{pyramid.duration:.1f}s at {pyramid.sample_rate} Hz, up to {pyramid.max_freq:.0f} Hz")
+    for index, level in enumerate(pyramid.levels):
+        print(f"  level {index}: {level.shape[0]} frames x {level.shape[1]} bins in {level.filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Stream raw PCM into the sliding-window spectrum instead of synthesizing it
+
+Raw interleaved PCM is read from stdin ("-"), a FIFO or a Unix socket
+("unix:/path/to.sock") straight into a preallocated ring buffer: the
+asyncio transport receives into memory views of the buffer, so samples
+are never copied on the way in. A consumer coroutine turns every hop of
+new samples into the spectrum of the latest window. Both sides apply
+backpressure: when the renderer falls behind, the frame queue fills, the
+consumer stops draining the ring buffer, and once the buffer is full the
+transport stops reading, which in turn blocks the writing process.
+
+    python streaming.py - --sample-rate 44100 < capture.raw
+    FOURIER_STREAM=- manim fourier.py StreamingSpectrum < capture.raw
+"""
+import argparse
+import asyncio
+import os
+import queue
+import stat
+import sys
+import threading
+
+import numpy as np
+
+from audio import to_mono_float
+from dsp import positive_freqs, window_magnitudes
+
+
+class RingBuffer:
+    """Preallocated circular buffer of interleaved PCM frames, filled in place
+
+    Writers ask for a writable memory view, fill it (e.g. with recv_into)
+    and commit the byte count; readers peek at whole frames and consume
+    them. Positions only ever grow, so full and empty are unambiguous"""
+    def __init__(self, capacity, channels=1, dtype=np.int16):
+        self.channels = channels
+        self.frames = np.zeros((capacity, channels), dtype=dtype)
+        self.raw = memoryview(self.frames).cast("B")
+        self.frame_bytes = self.frames.itemsize * channels
+        self.capacity_bytes = len(self.raw)
+        self.write_pos = 0  # Total bytes written
+        self.read_pos = 0  # Total frames consumed
+
+    def free_bytes(self):
+        return self.capacity_bytes - (self.write_pos - self.read_pos * self.frame_bytes)
+
+    def writable(self):
+        """Largest contiguous free region as a writable byte view"""
+        start = self.write_pos % self.capacity_bytes
+        return self.raw[start:start + min(self.free_bytes(), self.capacity_bytes - start)]
+
+    def commit(self, n_bytes):
+        self.write_pos += n_bytes
+
+    def available(self):
+        """Whole frames written but not yet consumed"""
+        return self.write_pos // self.frame_bytes - self.read_pos
+
+    def peek(self, n_frames):
+        """The next n_frames unconsumed frames (copied, as they may wrap around)"""
+        indices = np.arange(self.read_pos, self.read_pos + n_frames)
+        return self.frames.take(indices, axis=0, mode="wrap")
+
+    def consume(self, n_frames):
+        self.read_pos += n_frames
+
+
+class RingBufferProtocol(asyncio.BufferedProtocol):
+    """Receives a socket directly into a RingBuffer"""
+    def __init__(self, ring):
+        self.ring = ring
+        self.transport = None
+        self.paused = False
+        self.data_ready = asyncio.Event()
+        self.finished = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.ring.writable()
+
+    def buffer_updated(self, n_bytes):
+        self.ring.commit(n_bytes)
+        self.data_ready.set()
+        if self.ring.free_bytes() == 0:
+            # Consumer is behind: stop reading until it frees space
+            self.transport.pause_reading()
+            self.paused = True
+
+    def space_freed(self):
+        """Called by the consumer after consuming frames"""
+        if self.paused and self.ring.free_bytes() >= self.ring.capacity_bytes // 2:
+            self.paused = False
+            self.transport.resume_reading()
+
+    def eof_received(self):
+        self.finished = True
+        self.data_ready.set()
+
+    def connection_lost(self, exc):
+        self.finished = True
+        self.data_ready.set()
+
+
+class PipeReader:
+    """Reads a pipe, FIFO or stdin straight into a RingBuffer
+
+    Pipe transports only deliver copies (data_received), so the pipe is
+    watched directly and read into the ring buffer with readinto"""
+    def __init__(self, ring, file):
+        self.ring = ring
+        self.file = file
+        self.data_ready = asyncio.Event()
+        self.finished = False
+        self.paused = False
+        self.loop = asyncio.get_running_loop()
+        os.set_blocking(file.fileno(), False)
+        self.loop.add_reader(file.fileno(), self._read_ready)
+
+    def _read_ready(self):
+        n_bytes = self.file.readinto(self.ring.writable())
+        if n_bytes is None:  # Spurious wakeup, nothing to read yet
+            return
+        if n_bytes == 0:
+            self.loop.remove_reader(self.file.fileno())
+            self.finished = True
+        else:
+            self.ring.commit(n_bytes)
+            if self.ring.free_bytes() == 0:
+                # Consumer is behind: stop reading until it frees space
+                self.loop.remove_reader(self.file.fileno())
+                self.paused = True
+        self.data_ready.set()
+
+    def space_freed(self):
+        """Called by the consumer after consuming frames"""
+        if self.paused and self.ring.free_bytes() >= self.ring.capacity_bytes // 2:
+            self.paused = False
+            self.loop.add_reader(self.file.fileno(), self._read_ready)
+
+
+class FileReader:
+    """PipeReader stand-in for regular files, which cannot be watched for readiness"""
+    def __init__(self, ring, file):
+        self.ring = ring
+        self.file = file
+        self.data_ready = asyncio.Event()
+        self.space = asyncio.Event()
+        self.finished = False
+
+    async def run(self):
+        while True:
+            if self.ring.free_bytes() == 0:
+                self.space.clear()
+                await self.space.wait()
+            n_bytes = await asyncio.to_thread(self.file.readinto, self.ring.writable())
+            if not n_bytes:
+                break
+            self.ring.commit(n_bytes)
+            self.data_ready.set()
+        self.finished = True
+        self.data_ready.set()
+
+    def space_freed(self):
+        self.space.set()
+
+
+async def open_source(source, ring):
+    """Start reading source into ring, returning the protocol that fills it"""
+    loop = asyncio.get_running_loop()
+    if source.startswith("unix:"):
+        protocol = RingBufferProtocol(ring)
+        await loop.create_unix_connection(lambda: protocol, source[len("unix:"):])
+        return protocol
+
+    file = open(sys.stdin.fileno() if source == "-" else source, "rb", buffering=0, closefd=source != "-")
+    if stat.S_ISREG(os.fstat(file.fileno()).st_mode):
+        reader = FileReader(ring, file)
+        reader.task = asyncio.ensure_future(reader.run())  # Keep a reference to the task
+        return reader
+
+    return PipeReader(ring, file)  # Pipes, FIFOs and stdin
+
+
+async def stream_spectra(source, frames, sample_rate, window_size, hop_size,
+                         channels=1, dtype=np.int16, capacity=None):
+    """Put the spectrum of every hop of the stream on the frames queue
+
+    frames is a (thread-safe) queue.Queue; a full queue blocks this
+    pipeline, which is how rendering applies backpressure. None is put
+    on the queue when the stream ends"""
+    capacity = capacity or 8 * max(window_size, hop_size)
+    ring = RingBuffer(capacity, channels, dtype)
+    reader = await open_source(source, ring)
+
+    while True:
+        if ring.available() < window_size:
+            if reader.finished:
+                break
+            reader.data_ready.clear()
+            await reader.data_ready.wait()
+            continue
+
+        window = to_mono_float(ring.peek(window_size))
+        magnitudes = 2.0/window_size * window_magnitudes(window, window_size, [0])[0]
+        await asyncio.to_thread(frames.put, (window, magnitudes))
+        ring.consume(hop_size)
+        reader.space_freed()
+
+    await asyncio.to_thread(frames.put, None)
+
+
+class SpectrumStream:
+    """Runs the asyncio pipeline in a background thread for synchronous renderers
+
+    next_frame() blocks until the next hop's (window samples, magnitudes)
+    are ready and returns None once the stream has ended"""
+    def __init__(self, source, sample_rate, window_width, hop_size, channels=1,
+                 dtype=np.int16, max_pending_frames=8):
+        self.sample_rate = sample_rate
+        self.window_size = int(round(window_width * sample_rate))
+        self.freqs = positive_freqs(self.window_size, sample_rate)
+        self.frames = queue.Queue(maxsize=max_pending_frames)
+        self.finished = False
+        self.thread = threading.Thread(
+            target=asyncio.run,
+            args=(stream_spectra(
+                source, self.frames, sample_rate, self.window_size, hop_size, channels, np.dtype(dtype)
+            ),),
+            daemon=True
+        )
+        self.thread.start()
+
+    def next_frame(self):
+        if self.finished:
+            return None
+        frame = self.frames.get()
+        if frame is None:
+            self.finished = True
+        return frame
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the spectral peak of every hop of a PCM stream")
+    parser.add_argument("source", help='"-" for stdin, a FIFO path or unix:/path/to.sock')
+    parser.add_argument("--sample-rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--dtype", default="int16", help="Sample format, e.g. int16 or float32")
+    parser.add_argument("--window-width", type=float, default=0.1, help="Seconds")
+    parser.add_argument("--hop", type=int, default=1024, help="Samples")
+    args = parser.parse_args(argv)
+
+    stream = SpectrumStream(
+        args.source, args.sample_rate, args.window_width, args.hop, args.channels, args.dtype
+    )
+    n_frames = 0
+    while (frame := stream.next_frame()) is not None:
+        _, magnitudes = frame
+        print(f"{n_frames * args.hop / args.sample_rate:8.2f}s  peak {stream.freqs[magnitudes.argmax()]:8.1f} Hz")
+        n_frames += 1
+
+
+if __name__ == "__main__":
+    main()
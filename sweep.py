@@ -0,0 +1,167 @@
+"""Render many variants of a parameterized scene from a spec file
+
+    python sweep.py variants.json -q m -j 8 -o media/variants
+    python sweep.py variants.yaml              # YAML specs need PyYAML
+
+A spec lists overrides of a scene's params dict, one set per variant:
+
+    {
+      "file": "fourier.py",
+      "scene": "FFT",
+      "base": {"sample_rate": 200},
+      "variants": [
+        {"name": "two_tones", "components": [[2, 1], [5, 0.5]]},
+        {"name": "wide_window", "window_width": 1.0},
+        {"name": "per_frame", "n_positions": null, "source": "sliding"}
+      ]
+    }
+
+A bare list of variants is short for the FFT scene of fourier.py. The
+overrides are checked against the scene's defaults, read from its
+source, so the driver itself does not import manim. Before rendering,
+the arrays of every variant are computed once per distinct set of inputs
+into the on-disk array cache, where the worker processes find them.
+Every variant then renders in its own worker process and is copied to
+the output directory under its name.
+"""
+import argparse
+import ast
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import inspect
+import json
+import os
+import shutil
+import time
+
+from render_all import QUALITIES, render_scene
+
+
+DEFAULT_FILE = "fourier.py"
+DEFAULT_SCENE = "FFT"
+
+# Array cache shared by the driver and the workers, unless FOURIER_CACHE_DIR is set
+SWEEP_CACHE_DIR = os.path.join("media", "array_cache")
+
+
+def load_spec(path):
+    """(scene file, scene name, [(variant name, overrides)]) of a JSON or YAML spec"""
+    with open(path, encoding="utf-8") as spec_file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("YAML specs need PyYAML (pip install pyyaml), or use JSON") from None
+            spec = yaml.safe_load(spec_file)
+        else:
+            spec = json.load(spec_file)
+
+    if isinstance(spec, list):
+        spec = {"variants": spec}
+    scene_name = spec.get("scene", DEFAULT_SCENE)
+    base = spec.get("base", {})
+
+    variants = []
+    for index, variant in enumerate(spec["variants"]):
+        overrides = {**base, **variant}
+        name = str(overrides.pop("name", f"{scene_name}_{index:02d}"))
+        variants.append((name, overrides))
+
+    names = [name for name, _ in variants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate variant names: {', '.join(duplicates)}")
+    return spec.get("file", DEFAULT_FILE), scene_name, variants
+
+
+def scene_defaults(path, scene_name):
+    """The params dict written in a scene class, read without importing the file"""
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), filename=path)
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == scene_name:
+            for statement in node.body:
+                if (isinstance(statement, ast.Assign)
+                        and any(getattr(target, "id", None) == "params" for target in statement.targets)):
+                    return ast.literal_eval(statement.value)
+            raise ValueError(f"{scene_name} in {path} has no params dict to vary")
+    raise ValueError(f"No scene {scene_name} in {path}")
+
+
+def precompute(scene_name, variants, defaults, quality):
+    """Compute the arrays of every distinct variant input once, into the shared cache
+
+    Inputs are drafted as the scene will draft them at this quality"""
+    from cache import CACHE, params_key
+    from draft import QUALITY_HEIGHTS, detail, draft_params
+    from dsp import SCENE_DATA, load_or_compute
+
+    if scene_name not in SCENE_DATA:
+        return 0
+    names = inspect.signature(SCENE_DATA[scene_name]).parameters
+    done = set()
+    for _, overrides in variants:
+        params = {**defaults, **overrides}
+        data_params = {name: params[name] for name in names if name in params}
+        data_params = draft_params(
+            scene_name, data_params, detail(params.get("draft"), QUALITY_HEIGHTS[quality])
+        )
+        # One position per video frame depends on the quality; those workers compute their own
+        if data_params.get("n_positions", 0) is None or params_key(data_params) in done:
+            continue
+        load_or_compute(scene_name, **data_params)
+        done.add(params_key(data_params))
+    CACHE.clear()  # The workers read the arrays back from disk
+    return len(done)
+
+
+def render_variants(path, scene_name, variants, quality, jobs, output_dir):
+    """Render every variant in a process pool and copy the videos to output_dir"""
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    timings = {}
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(variants)))) as pool:
+        futures = {
+            pool.submit(render_scene, path, scene_name, quality, params=overrides, output_file=name): name
+            for name, overrides in variants
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]
+            video, timings[name] = future.result()
+            shutil.copyfile(video, os.path.join(output_dir, f"{name}.mp4"))
+            print(f"[{done}/{len(variants)}] {name} rendered in {timings[name]:.1f}s")
+
+    print("\nVariant timings:")
+    for name, _ in variants:
+        print(f"  {name:<32}{timings[name]:8.1f}s")
+    print(f"  {'Total (wall clock)':<32}{time.perf_counter() - start:8.1f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the variants of a scene listed in a spec file")
+    parser.add_argument("spec", help="JSON or YAML list of parameter overrides")
+    parser.add_argument("-q", "--quality", choices=QUALITIES, default="l")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: one per core)")
+    parser.add_argument("-o", "--output-dir", default=os.path.join("media", "variants"))
+    args = parser.parse_args(argv)
+
+    path, scene_name, variants = load_spec(args.spec)
+    defaults = scene_defaults(path, scene_name)
+    for name, overrides in variants:
+        unknown = sorted(set(overrides) - set(defaults))
+        if unknown:
+            parser.error(f"Variant {name}: unknown parameters {', '.join(unknown)} "
+                         f"(known: {', '.join(defaults)})")
+
+    # Workers inherit the cache location, so precomputed arrays are shared with them
+    os.environ.setdefault("FOURIER_CACHE_DIR", SWEEP_CACHE_DIR)
+    from cache import CACHE
+    CACHE.directory = os.environ["FOURIER_CACHE_DIR"]
+    n_inputs = precompute(scene_name, variants, defaults, QUALITIES[args.quality])
+    print(f"Precomputed {n_inputs} distinct input sets for {len(variants)} variants")
+
+    render_variants(path, scene_name, variants, QUALITIES[args.quality], args.jobs, args.output_dir)
+
+
+if __name__ == "__main__":
+    main()